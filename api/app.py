@@ -1,16 +1,26 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g, stream_with_context
 import pandas as pd
 import util as utils
-import joblib
+import registry
+import telemetry
+import profiler
+import prediction_log
+import log_store as log_stores
+import model_loader
+import batch_codec
+import micro_batch
+import single_flight
 import os
+import csv
 import json
+import hashlib
+import time
+import threading
 from datetime import datetime
-from collections import deque
 import numpy as np
 
 # Evidently for Data Drift Detection (v0.4.x API)
 from evidently.report import Report
-from evidently.metric_preset import DataDriftPreset
 from evidently.metrics import DataDriftTable, DatasetDriftMetric
 
 app = Flask(__name__)
@@ -19,12 +29,14 @@ app = Flask(__name__)
 # PREDICTION LOGGING SYSTEM
 # -----------------------------------------------------------------------------
 MAX_LOG_SIZE = 100
-prediction_logs = deque(maxlen=MAX_LOG_SIZE)
+log_store = None  # log_store.MemoryLogStore / SQLiteLogStore, created once the config is loaded
+log_writer = None  # prediction_log.AsyncLogWriter, created once the config is loaded
+log_file_path = None
 
 def log_prediction(input_data, prediction, status="success", error_msg=None, model_used="Unknown", details=None):
-    """Log each prediction request"""
+    """Queue a log entry for each prediction request (written by the background log writer)"""
     log_entry = {
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "ts_ms": time.time_ns() // 1_000_000,
         "input": input_data,
         "prediction": prediction,
         "status": status,
@@ -32,19 +44,27 @@ def log_prediction(input_data, prediction, status="success", error_msg=None, mod
         "model_used": model_used,
         "details": details
     }
-    prediction_logs.append(log_entry)
+    log_writer.submit(log_entry)
     return log_entry
 
+def write_log_batch(batch):
+    """Log writer sink: store the entries and append them to the JSONL log file if configured"""
+    log_store.write_batch(batch, dropped=log_writer.take_dropped())
+    if log_file_path:
+        with open(log_file_path, "a") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in batch))
+
+def format_log(log_entry):
+    # Timestamps are stored as epoch milliseconds and only formatted for /logs
+    formatted = {k: v for k, v in log_entry.items() if k != "ts_ms"}
+    formatted["timestamp"] = datetime.fromtimestamp(log_entry["ts_ms"] / 1000).strftime("%Y-%m-%d %H:%M:%S")
+    return formatted
+
 # -----------------------------------------------------------------------------
 # DATA DRIFT DETECTION WITH EVIDENTLY
 # -----------------------------------------------------------------------------
-# Reference data from training (will be loaded on startup)
-reference_data = None
-reference_stats = None
-
-def load_reference_stats():
-    """Load training data for drift detection with Evidently"""
-    global reference_data, reference_stats
+def load_reference_stats(model_dir, model_version):
+    """Load training data for drift detection with Evidently, returns (reference_data, reference_stats)"""
     
     # helper for stats
     def calc_stats(df):
@@ -57,22 +77,33 @@ def load_reference_stats():
         }
 
     try:
-        base_dir = os.path.dirname(os.path.abspath(__file__))
         data_dirs = [
             os.path.join(base_dir, "..", "data"), # Local
             os.path.join(base_dir, "data")        # Docker
         ]
         
+        # 0. Try the reference profile published with the serving model version
+        try:
+            p = os.path.join(model_dir, "reference.pkl")
+            if os.path.exists(p):
+                print(f"Loading reference from {p}")
+                reference_data = utils.pickle_load(p)
+                reference_stats = calc_stats(reference_data)
+                print(f"Loaded {len(reference_data)} rows from model version {model_version}.")
+                return reference_data, reference_stats
+        except Exception as e:
+            print(f"Failed to load registry reference: {e}")
+
         # 1. Try Pickle
         try:
             for d in data_dirs:
                 p = os.path.join(d, "processed", "x_train.pkl")
                 if os.path.exists(p):
                     print(f"Loading reference from {p}")
-                    reference_data = pd.read_pickle(p)
+                    reference_data = utils.pickle_load(p)
                     reference_stats = calc_stats(reference_data)
                     print(f"Loaded {len(reference_data)} rows from pickle.")
-                    return
+                    return reference_data, reference_stats
         except Exception as e:
             print(f"Failed to load pickle: {e}")
 
@@ -87,7 +118,7 @@ def load_reference_stats():
                     reference_data = df[features].dropna()
                     reference_stats = calc_stats(reference_data)
                     print(f"Loaded {len(reference_data)} rows from Excel.")
-                    return
+                    return reference_data, reference_stats
         except Exception as e:
             print(f"Failed to load Excel: {e}")
 
@@ -110,42 +141,18 @@ def load_reference_stats():
         reference_data = pd.DataFrame(columns=["LB", "LT", "KT", "KM", "GRS"])
         reference_stats = calc_stats(reference_data)
 
-def calculate_drift_evidently(recent_predictions):
-    """Calculate data drift using Evidently library"""
-    global reference_data
-    
+    return reference_data, reference_stats
+
+def calculate_drift_evidently(current_data, reference_data, reference_stats):
+    """Calculate data drift using Evidently library (current_data: inputs of recent successful predictions)"""
     # Check if reference data is available and not empty
     if reference_data is None or len(reference_data) == 0:
         return None
-        
-    if len(recent_predictions) < 5:
-        return None
     
-    # Extract input features from recent predictions
-    recent_inputs = []
-    for log in recent_predictions:
-        if log["status"] == "success":
-            input_data = log["input"]
-            clean_input = {}
-            for key, val in input_data.items():
-                if isinstance(val, list):
-                    clean_input[key] = val[0] if len(val) > 0 else 0
-                else:
-                    clean_input[key] = val
-            recent_inputs.append(clean_input)
-    
-    if len(recent_inputs) < 5:
+    if len(current_data) < 5:
         return None
     
-    # Create current data DataFrame
-    current_data = pd.DataFrame(recent_inputs)
     features = ["LB", "LT", "KT", "KM", "GRS"]
-    
-    # Ensure both dataframes have the same columns
-    for f in features:
-        if f not in current_data.columns:
-            current_data[f] = 0
-    
     current_data = current_data[features]
     ref_data = reference_data[features].copy()
     
@@ -163,7 +170,7 @@ def calculate_drift_evidently(recent_predictions):
         
         # Parse Evidently results
         drift_results = parse_evidently_report(report_dict, current_data, ref_data)
-        drift_results["sample_size"] = len(recent_inputs)
+        drift_results["sample_size"] = len(current_data)
         drift_results["reference_size"] = len(reference_data)
         drift_results["method"] = "evidently"
         
@@ -172,7 +179,7 @@ def calculate_drift_evidently(recent_predictions):
     except Exception as e:
         print(f"Evidently error: {e}")
         # Fallback to simple method if Evidently fails
-        return calculate_drift_simple(recent_inputs, features)
+        return calculate_drift_simple(current_data, features, reference_stats)
 
 def parse_evidently_report(report_dict, current_data, ref_data):
     """Parse Evidently report dictionary to extract drift information"""
@@ -280,9 +287,34 @@ def parse_evidently_report(report_dict, current_data, ref_data):
         "features": drift_report
     }
 
-def calculate_drift_simple(recent_inputs, features):
+SEVERITY_COLORS = {"low": "#198754", "medium": "#fd7e14", "high": "#dc3545"}
+
+def build_drift_chart(features_drift):
+    """Chart-ready arrays for the admin dashboard, one entry per feature in feature order"""
+    codes = list(features_drift)
+    reference = np.array([features_drift[f]["reference_mean"] for f in codes], dtype=float)
+    current = np.array([features_drift[f]["current_mean"] for f in codes], dtype=float)
+    
+    # Change from the training mean (%) and radar values scaled per feature to 0-100
+    change = np.divide(current - reference, reference, out=np.zeros_like(reference), where=reference > 0) * 100
+    peak = np.maximum(reference, current)
+    peak[peak <= 0] = 1
+    severity = [features_drift[f]["severity"] for f in codes]
+    
+    return {
+        "features": codes,
+        "labels": [features_drift[f]["feature_name"] for f in codes],
+        "reference_mean": reference.round(2).tolist(),
+        "current_mean": current.round(2).tolist(),
+        "change_pct": change.round(2).tolist(),
+        "radar_reference": (reference / peak * 100).round(2).tolist(),
+        "radar_current": (current / peak * 100).round(2).tolist(),
+        "severity": severity,
+        "colors": [SEVERITY_COLORS.get(s, SEVERITY_COLORS["high"]) for s in severity]
+    }
+
+def calculate_drift_simple(df_recent, features, reference_stats):
     """Fallback simple drift calculation"""
-    df_recent = pd.DataFrame(recent_inputs)
     
     drift_report = {}
     feature_names = {
@@ -346,62 +378,295 @@ def calculate_drift_simple(recent_inputs, features):
 config_path = utils.get_config_path()
 config = utils.load_params(config_path)
 
-# Load Models (Model 1: Linear Regression, Model 2: Random Forest)
-model1 = None
-model2 = None
-model1_metadata = {}
-model2_metadata = {}
+# Background prediction log writer
+log_config = config.get("prediction_log", {})
+log_store = log_stores.create_log_store(log_config, config['prediktor'], utils.BASE_DIR, MAX_LOG_SIZE)
+if log_config.get("path"):
+    log_file_path = os.path.join(utils.BASE_DIR, log_config["path"])
+    os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
+log_writer = prediction_log.AsyncLogWriter(
+    write_log_batch,
+    capacity=log_config.get("queue_size", 10000),
+    batch_size=log_config.get("batch_size", 256),
+    flush_interval=log_config.get("flush_interval_ms", 50) / 1000,
+    policy=log_config.get("overflow_policy", prediction_log.DROP),
+    sample_every=log_config.get("sample_every", 10),
+    block_timeout=log_config.get("block_timeout_ms", 100) / 1000
+)
 
-try:
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    model1_path = os.path.join(base_dir, "models", "model_1.pkl")
-    model2_path = os.path.join(base_dir, "models", "model_2.pkl")
-    
-    if os.path.exists(model1_path):
-        model1 = utils.pickle_load(model1_path)
-        print("Model 1 (Linear Regression) loaded.")
-    
-    if os.path.exists(model2_path):
-        model2 = utils.pickle_load(model2_path)
-        print("Model 2 (Random Forest) loaded.")
+# Micro-batching of concurrent single-row /predict calls (None: predict per request)
+batch_config = config.get("micro_batching", {})
+batcher = None
+if batch_config.get("enabled", False):
+    batcher = micro_batch.MicroBatcher(
+        config['prediktor'],
+        max_batch_size=batch_config.get("max_batch_size", 32),
+        max_latency=batch_config.get("max_latency_ms", 2) / 1000
+    )
+
+# Identical concurrent /predict calls share one computation (None: disabled)
+inflight_predictions = single_flight.SingleFlight() if config.get("coalesce_predictions", False) else None
+
+# -----------------------------------------------------------------------------
+# SERVING STATE
+# -----------------------------------------------------------------------------
+# Everything a request needs from the loaded model version (models, metadata,
+# active slot, drift reference) lives in one snapshot dict. Snapshots are never
+# mutated: a reload builds a new one and swaps the `serving` reference, so a
+# request that read `state = serving` once sees a consistent version throughout.
+base_dir = os.path.dirname(os.path.abspath(__file__))
+registry_dir = registry.get_registry_dir(config)
+reload_lock = threading.Lock()
+
+def load_serving_state():
+    """Load the version behind the registry CURRENT pointer (or models/ without a registry) into a new snapshot"""
+    model_version = registry.current_version(registry_dir)
+    model_dir = registry.version_dir(registry_dir, model_version) if model_version else os.path.join(base_dir, "models")
+
+    # Load Models (model_1.pkl, model_2.pkl, ... with their metrics.json entries)
+    models = {}
+    model_metadata = {}
+    active_slot = None
+    try:
+        print(f"Loading models from {model_dir} (version: {model_version or 'unversioned'})")
+
+        models, model_metadata = model_loader.load_models(model_dir, legacy_dir=os.path.join(base_dir, "models"))
+
+        selection = config.get("model_selection", {})
+        active_slot = model_loader.select_active_model(models, model_metadata, selection)
+        if active_slot:
+            print(f"Serving {model_loader.model_label(active_slot, model_metadata)} (score: {model_loader.selection_score(model_metadata.get(active_slot, {}), selection):.4f})")
         
-    # Also load the old production_model if model 1 is missing, for backward compatibility
-    if model1 is None:
-        prod_path = os.path.join(base_dir, "models", "production_model.pkl")
-        if os.path.exists(prod_path):
-             model1 = utils.pickle_load(prod_path)
-             print("Legacy Production Model loaded as Model 1.")
-
-    # Load Metrics to determine accuracy
-    metrics_path = os.path.join(base_dir, "models", "metrics.json")
-    if os.path.exists(metrics_path):
-        with open(metrics_path, 'r') as f:
-            metrics_data = json.load(f)
-            # Parse structure: could be old (flat) or new (nested)
-            if "model1" in metrics_data:
-                model1_metadata = metrics_data["model1"]
-                model2_metadata = metrics_data.get("model2", {})
-            else:
-                # Old format
-                model1_metadata = {"r2": metrics_data.get("r2", 0), "mape": metrics_data.get("mape", 0)}
-                model2_metadata = {}
-    
-except Exception as e:
-    print(f"Error loading models: {e}")
+    except Exception as e:
+        print(f"Error loading models: {e}")
+
+    # Load reference stats for drift detection
+    reference_data, reference_stats = load_reference_stats(model_dir, model_version)
+
+    return {
+        "model_version": model_version,
+        "model_dir": model_dir,
+        "models": models,
+        # /predict scores only this one unless ?all_models=1; one dict per snapshot
+        # so the micro-batcher groups those requests together
+        "active_models": {active_slot: models[active_slot]} if active_slot else {},
+        "model_metadata": model_metadata,
+        "active_slot": active_slot,
+        "active_model_name": model_loader.model_label(active_slot, model_metadata) if active_slot else "Unknown",
+        "reference_data": reference_data,
+        "reference_stats": reference_stats
+    }
+
+def reload_serving_state():
+    # Build and warm up the new snapshot off to the side, then publish it with one reference swap
+    global serving
+    with reload_lock:
+        serving = warm_up(load_serving_state())
+    return serving
 
-# Load reference stats for drift detection
-load_reference_stats()
+# -----------------------------------------------------------------------------
+# WARM-UP
+# -----------------------------------------------------------------------------
+# The first predict of a freshly loaded model pays lazy initialization in
+# sklearn/joblib and pandas. Each snapshot is warmed up with synthetic rows
+# before it counts as ready (/readyz); its timings are kept in state["warmup"].
+warmup_config = config.get("warmup", {})
+
+def synthetic_rows(n):
+    """n feature rows spread evenly over the rentang_<feature> ranges of params.yaml"""
+    ranges = [config.get(f"rentang_{p}", [1, 1]) for p in config['prediktor']]
+    return [
+        [int(low + (high - low) * i / max(n - 1, 1)) for low, high in ranges]
+        for i in range(n)
+    ]
+
+def elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 2)
+
+def warm_up(state):
+    """Run synthetic predictions through every model of a snapshot and prime the
+    metrics/drift code paths; returns a new snapshot carrying the timings"""
+    if not warmup_config.get("enabled", True):
+        return dict(state, warmup={"skipped": True})
+
+    start = time.perf_counter()
+    timings = {}
+    try:
+        rows = synthetic_rows(warmup_config.get("rows", 32))
+        df = pd.DataFrame(rows, columns=config['prediktor'], dtype='int64')
+        for slot, model in state["models"].items():
+            step = time.perf_counter()
+            model.predict(df.iloc[:1])
+            model.predict(df)
+            timings[slot] = elapsed_ms(step)
+
+        if batcher is not None and state["active_models"]:
+            step = time.perf_counter()
+            batcher.submit(state["active_models"], rows[0]).result(timeout=30)
+            timings["micro_batch"] = elapsed_ms(step)
+
+        metrics_path = os.path.join(state["model_dir"], "metrics.json")
+        if os.path.exists(metrics_path):
+            step = time.perf_counter()
+            read_metrics_file(metrics_path)
+            timings["metrics"] = elapsed_ms(step)
+
+        reference_data = state["reference_data"]
+        if reference_data is not None and len(reference_data) >= 5:
+            step = time.perf_counter()
+            calculate_drift_evidently(reference_data.head(50), reference_data, state["reference_stats"])
+            timings["drift"] = elapsed_ms(step)
+
+        step = time.perf_counter()
+        with app.app_context():
+            jsonify({"status": "success", "prediction": 0.0, "details": {}})
+        timings["serialize"] = elapsed_ms(step)
+    except Exception as e:
+        print(f"Warm-up failed: {e}")
+        return dict(state, warmup={"error": str(e), "timings_ms": timings})
+
+    total = elapsed_ms(start)
+    print(f"Warm-up of version {state['model_version'] or 'unversioned'} done in {total} ms")
+    return dict(state, warmup={
+        "timings_ms": timings,
+        "total_ms": total,
+        "finished_at": datetime.now().isoformat(timespec="seconds")
+    })
+
+def warm_up_serving_state():
+    global serving
+    with reload_lock:
+        serving = warm_up(serving)
+
+def is_ready(state):
+    warmup = state.get("warmup")
+    return state["active_slot"] is not None and warmup is not None and "error" not in warmup
+
+serving = load_serving_state()
 
 import data_preparation
 import preprocessing
 # Helper needed for pickle loading if it uses classes from these modules
 
+# -----------------------------------------------------------------------------
+# RUNTIME TELEMETRY
+# -----------------------------------------------------------------------------
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.model_used = "none"
+
+@app.after_request
+def record_request(response):
+    endpoint = request.endpoint or "unknown"
+    start = getattr(g, "request_start", None)
+    if start is not None:
+        telemetry.REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint)
+    telemetry.REQUESTS.inc(endpoint, response.status_code, getattr(g, "model_used", "none"))
+    return response
+
+# -----------------------------------------------------------------------------
+# ON-DEMAND PROFILING (admin only, requires the ADMIN_TOKEN environment variable)
+# -----------------------------------------------------------------------------
+@app.before_request
+def start_request_profile():
+    # Header lookup only, no profiling cost unless X-Profile is sent
+    if "X-Profile" in request.headers and profiler.is_admin(request.headers.get("X-Admin-Token")):
+        g.profile = profiler.RequestProfile.start()
+
+@app.after_request
+def attach_request_profile(response):
+    # Replace the body with the cProfile report, keep the original status in a header
+    request_profile = g.pop("profile", None)
+    if request_profile is None:
+        return response
+    profiled = Response(request_profile.report(), mimetype="text/plain")
+    profiled.headers["X-Profile-Status"] = str(response.status_code)
+    return profiled
+
+@app.route('/admin/profile', methods=['GET', 'POST'])
+def sample_profile():
+    """Run the sampling profiler for ?seconds=N and return collapsed stacks (flamegraph input)"""
+    if not profiler.is_admin(request.headers.get("X-Admin-Token")):
+        return jsonify({"status": "error", "message": "Admin token required"}), 403
+    seconds = request.args.get("seconds", 10, type=float)
+    interval_ms = request.args.get("interval_ms", 5, type=float)
+    if seconds <= 0 or interval_ms <= 0:
+        return jsonify({"status": "error", "message": "seconds and interval_ms must be positive"}), 400
+
+    result = profiler.sample(seconds, interval_ms / 1000)
+    if result is None:
+        return jsonify({"status": "error", "message": "A profile is already running"}), 409
+    stacks, samples = result
+    response = Response(stacks, mimetype="text/plain")
+    response.headers["X-Profile-Samples"] = str(samples)
+    return response
+
+# metrics.json only changes when a new version is published, keep it parsed in memory.
+# The (key, data) pair is replaced as one tuple so concurrent readers never mix them.
+_metrics_cache = (None, None)
+
+def read_metrics_file(metrics_path):
+    global _metrics_cache
+    key = (metrics_path, os.path.getmtime(metrics_path))
+    cached_key, data = _metrics_cache
+    hit = cached_key == key
+    telemetry.record_cache("metrics_json", hit)
+    if not hit:
+        with open(metrics_path, "r") as f:
+            data = json.load(f)
+        _metrics_cache = (key, data)
+    return dict(data)
+
 @app.route('/')
 def home():
-    return "House Price Prediction API is Up! (Dual Model Supported)"
+    return "House Price Prediction API is Up! (Multi Model Supported)"
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: the process answers requests (models may still be warming up)"""
+    state = serving
+    return jsonify({
+        "status": "ok",
+        "ready": is_ready(state),
+        "model_version": state["model_version"],
+        "uptime_s": round(time.time() - telemetry.START_TIME, 1)
+    })
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness: a model is loaded and warmed up; 503 until then"""
+    state = serving
+    ready = is_ready(state)
+    return jsonify({
+        "status": "ready" if ready else "not_ready",
+        "model_version": state["model_version"],
+        "active_model": state["active_model_name"] if state["active_slot"] else None,
+        "models": {slot: model_loader.model_label(slot, state["model_metadata"]) for slot in state["models"]},
+        "warmup": state.get("warmup")
+    }), 200 if ready else 503
+
+def predict_models(models, df, row, timer):
+    """{slot: prediction} of the given models for one request"""
+    if batcher is not None:
+        # Shares one vectorized predict per model with concurrent requests
+        predictions = batcher.submit(models, row).result(timeout=30)
+        timer.mark("batch_predict")
+        return predictions
+    predictions = {}
+    for slot, model in models.items():
+        predictions[slot] = float(model.predict(df)[0])
+        timer.mark(f"model_{slot}")
+    return predictions
 
 @app.route('/predict', methods=['POST'])
 def predict():
+    timer = telemetry.StageTimer()
+    state = serving
+    active_slot = state["active_slot"]
+    # The other models only run when a caller asks to compare them
+    all_models = request.args.get("all_models", "").lower() in ("1", "true", "yes")
+    models = state["models"] if all_models else state["active_models"]
     try:
         data_json = request.get_json()
         
@@ -426,45 +691,30 @@ def predict():
         # Ensure correct data types (int64)
         for p in predictors:
             df[p] = df[p].astype('int64')
+        timer.mark("parse")
 
         # Validate data
         try:
            data_preparation.cek_data(df, config, True)
         except AssertionError as ae:
             return jsonify({"status": "error", "message": f"Validation Error: {str(ae)}"}), 400
+        timer.mark("validate")
 
-        # Predict with Model 1 (Linear Regression)
-        pred1 = 0
-        if model1:
-            pred1 = model1.predict(df)[0]
-        
-        # Predict with Model 2 (Random Forest)
-        pred2 = 0
-        if model2:
-            pred2 = model2.predict(df)[0]
-        
-        # Decision Logic: Use the model with higher accuracy
-        active_prediction = pred1
-        active_model_name = "Model 1 (Linear Regression)"
-        
-        model1_r2 = model1_metadata.get("r2", 0)
-        model2_r2 = model2_metadata.get("r2", 0)
-        
-        use_model2 = False
+        # Predict with the active model (every loaded model with ?all_models=1)
+        row = [int(data_json[p]) for p in predictors]
+        if inflight_predictions is not None:
+            # Key: canonical feature values + the models of the snapshot they are scored with
+            key = (state["model_version"], id(models), tuple(row))
+            predictions, shared = inflight_predictions.do(key, lambda: predict_models(models, df, row, timer))
+            if shared:
+                telemetry.PREDICT_COALESCED.inc()
+                timer.mark("coalesced")
+        else:
+            predictions = predict_models(models, df, row, timer)
         
-        if model2 and model1:
-             if model2_r2 > model1_r2:
-                 use_model2 = True
-                 print(f"Choosing Model 2 (R2: {model2_r2:.4f}) over Model 1 (R2: {model1_r2:.4f})")
-             else:
-                 print(f"Choosing Model 1 (R2: {model1_r2:.4f}) over Model 2 (R2: {model2_r2:.4f})")
-        elif model2 and not model1:
-             use_model2 = True
-             print("Model 1 missing, using Model 2")
-             
-        if use_model2:
-            active_prediction = pred2
-            active_model_name = "Model 2 (Random Forest)"
+        # Decision Logic: Use the model selected at startup (score + latency/size budget)
+        active_prediction = predictions.get(active_slot, 0)
+        active_model_name = state["active_model_name"]
         
         # Result
         result = float(active_prediction)
@@ -472,49 +722,372 @@ def predict():
         # Log the successful prediction with clean data (not list format)
         log_input = {p: data_json[p] for p in predictors}
         
+        # Same keys as before (every loaded slot, always model1/model2); models
+        # that did not run have a null prediction and all_models tells which case it is
         details = {
-            "model1": {
-                "prediction": float(pred1) if model1 else None,
-                "r2": model1_r2
-            },
-            "model2": {
-                "prediction": float(pred2) if model2 else None,
-                "r2": model2_metadata.get("r2", 0)
-            },
-            "switched": active_model_name.startswith("Model 2")
+            slot: {
+                "prediction": predictions.get(slot),
+                "r2": state["model_metadata"].get(slot, {}).get("r2", 0)
+            }
+            for slot in sorted(set(state["models"]) | {"model1", "model2"})
         }
+        details["switched"] = active_slot not in (None, "model1")
+        details["all_models"] = all_models
         
         log_prediction(log_input, result, "success", model_used=active_model_name, details=details)
+        timer.mark("log")
+        g.model_used = active_slot or "none"
         
-        return jsonify({
+        response = jsonify({
             "status": "success",
             "prediction": result,
             "model_used": active_model_name,
+            "model_version": state["model_version"],
             "details": details
         })
+        timer.mark("serialize")
+        return response
         
     except Exception as e:
         # Log the failed prediction
         log_prediction(data_json if 'data_json' in dir() else {}, None, "error", str(e))
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def batch_frame(data, predictors):
+    """int64 feature frame from a decoded JSON/MessagePack body: {"instances": [...]},
+    a plain list of rows, or columnar {"LB": [...], "LT": [...], ...}"""
+    if isinstance(data, dict) and "instances" not in data and data and all(isinstance(v, list) for v in data.values()):
+        missing = [p for p in predictors if p not in data]
+        if missing:
+            raise ValueError(f"Missing features: {missing}")
+        if len({len(data[p]) for p in predictors}) != 1:
+            raise ValueError("Columnar body needs equally long feature lists")
+        rows = None
+        df = pd.DataFrame({p: data[p] for p in predictors})
+    else:
+        rows = data.get("instances") if isinstance(data, dict) else data
+        if not isinstance(rows, list):
+            raise ValueError("Expected a non-empty list in 'instances'")
+        missing_rows = [i for i, row in enumerate(rows) if not isinstance(row, dict) or any(p not in row for p in predictors)]
+        if missing_rows:
+            raise ValueError(f"Missing features in rows: {missing_rows[:10]}")
+        df = pd.DataFrame(rows, columns=predictors)
+    if df.empty:
+        raise ValueError("Expected a non-empty list in 'instances'")
+    try:
+        return df.astype('int64')
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Features must be integers: {e}")
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """Score a list of houses with one vectorized predict call per model.
+    Accepts and returns JSON (default), Arrow IPC or MessagePack, see batch_codec."""
+    try:
+        in_format = batch_codec.request_format(request.mimetype)
+        out_format = batch_codec.response_format(request.accept_mimetypes, in_format)
+    except batch_codec.UnsupportedFormat as e:
+        return jsonify({"status": "error", "message": str(e)}), 415
+
+    try:
+        predictors = config['prediktor']
+        max_rows = config.get('batch_max_rows', 1000)
+        state = serving
+        active_slot = state["active_slot"]
+        
+        try:
+            if in_format == batch_codec.ARROW:
+                df = batch_codec.decode_arrow(request.get_data(), predictors)
+            elif in_format == batch_codec.MSGPACK:
+                df = batch_frame(batch_codec.decode_msgpack(request.get_data()), predictors)
+            else:
+                # silent: malformed JSON or a missing Content-Type is a client error, not a 500
+                data = request.get_json(silent=True)
+                if data is None:
+                    return jsonify({"status": "error", "message": "Expected a JSON body (Content-Type: application/json)"}), 400
+                df = batch_frame(data, predictors)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        if len(df) > max_rows:
+            return jsonify({"status": "error", "message": f"Batch too large: {len(df)} rows (max {max_rows})"}), 413
+        
+        # Validate data
+        try:
+           data_preparation.cek_data(df, config, True)
+        except AssertionError as ae:
+            return jsonify({"status": "error", "message": f"Validation Error: {str(ae)}"}), 400
+        
+        if active_slot is None:
+            return jsonify({"status": "error", "message": "No model loaded"}), 503
+        predictions = state["models"][active_slot].predict(df)
+        active_model_name = state["active_model_name"]
+        g.model_used = active_slot
+        
+        for values, prediction in zip(df.to_numpy().tolist(), predictions.tolist()):
+            log_prediction(dict(zip(predictors, values)), prediction, "success", model_used=active_model_name)
+        
+        if out_format == batch_codec.ARROW:
+            return Response(batch_codec.encode_arrow(predictions, active_model_name, state["model_version"]),
+                            mimetype=batch_codec.ARROW)
+        body = {
+            "status": "success",
+            "predictions": predictions.tolist(),
+            "count": len(predictions),
+            "model_used": active_model_name,
+            "model_version": state["model_version"]
+        }
+        if out_format == batch_codec.MSGPACK:
+            return Response(batch_codec.encode_msgpack(body), mimetype=batch_codec.MSGPACK)
+        return jsonify(body)
+        
+    except Exception as e:
+        log_prediction({}, None, "error", str(e))
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+def parse_stream_row(line, predictors, csv_header=None):
+    """One input line -> {predictor: int}; raises ValueError with a message for the client"""
+    if csv_header is not None:
+        values = next(csv.reader([line]))
+        if len(values) != len(csv_header):
+            raise ValueError(f"Expected {len(csv_header)} columns, got {len(values)}")
+        row = dict(zip(csv_header, values))
+    else:
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e.msg}")
+        if not isinstance(row, dict):
+            raise ValueError("Expected a JSON object")
+
+    missing = [p for p in predictors if p not in row]
+    if missing:
+        raise ValueError(f"Missing features: {missing}")
+    parsed = {}
+    for p in predictors:
+        value = row[p]
+        try:
+            # int() would truncate 1.5 to 1; only whole numbers are integers
+            if isinstance(value, float) and not value.is_integer():
+                raise ValueError(value)
+            parsed[p] = int(value)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"Feature {p} must be an integer, got {value!r}")
+    return parsed
+
+def score_stream(lines, is_csv, state, batch_rows):
+    """Read lines lazily and yield one NDJSON result per input line, scored in
+    micro-batches of batch_rows; only one micro-batch is held in memory"""
+    predictors = config['prediktor']
+    model = state["models"][state["active_slot"]]
+    csv_header = None
+    counts = {"rows": 0, "success": 0, "error": 0}
+    pending = []  # (line_no, row or None, error)
+
+    def flush():
+        valid = [(n, row) for n, row, _ in pending if row is not None]
+        predictions, failure = [], None
+        if valid:
+            try:
+                df = pd.DataFrame([row for _, row in valid], columns=predictors).astype('int64')
+                data_preparation.cek_data(df, config, True)
+                predictions = model.predict(df).tolist()
+            except Exception as e:
+                failure = str(e)
+        predicted = dict(zip((n for n, _ in valid), predictions))
+        out = []
+        for n, row, error in pending:
+            if row is not None and failure is None:
+                result = {"line": n, "prediction": predicted[n]}
+                counts["success"] += 1
+            else:
+                result = {"line": n, "error": error or failure}
+                counts["error"] += 1
+            out.append(json.dumps(result))
+        pending.clear()
+        return "\n".join(out) + "\n" if out else ""
+
+    for line_no, raw in enumerate(lines, start=1):
+        line = raw.decode("utf-8", errors="replace").strip() if isinstance(raw, bytes) else raw.strip()
+        if not line:
+            continue
+        if is_csv and csv_header is None:
+            csv_header = [h.strip() for h in next(csv.reader([line]))]
+            continue
+        counts["rows"] += 1
+        try:
+            pending.append((line_no, parse_stream_row(line, predictors, csv_header), None))
+        except ValueError as e:
+            pending.append((line_no, None, str(e)))
+        if len(pending) >= batch_rows:
+            yield flush()
+    if pending:
+        yield flush()
+
+    yield json.dumps({
+        "summary": dict(counts, model_used=state["active_model_name"], model_version=state["model_version"])
+    }) + "\n"
+
+@app.route('/predict/stream', methods=['POST'])
+def predict_stream():
+    """Score an NDJSON (or CSV, Content-Type: text/csv) body of any size.
+    Results are streamed back as NDJSON, one line per input line, followed by a
+    summary line. Rows are not added to the prediction log."""
+    state = serving
+    if state["active_slot"] is None:
+        return jsonify({"status": "error", "message": "No model loaded"}), 503
+    is_csv = request.mimetype in ("text/csv", "application/csv")
+    batch_rows = config.get('stream_batch_rows', 256)
+    g.model_used = state["active_slot"]
+    # request.stream is read line by line inside the generator, so neither the
+    # request body nor the response is ever fully buffered
+    return Response(
+        stream_with_context(score_stream(request.stream, is_csv, state, batch_rows)),
+        mimetype="application/x-ndjson"
+    )
+
+def build_metrics_data(state):
+    """metrics.json of the serving model version, None if it has no metrics"""
+    metrics_path = os.path.join(state["model_dir"], "metrics.json")
+    if not os.path.exists(metrics_path):
+        return None
+    metrics = read_metrics_file(metrics_path)
+    metrics["active_model"] = state["active_slot"]
+    metrics["model_version"] = state["model_version"]
+    return metrics
+
+def build_logs_data(limit, status_filter=None):
+    # Most recent first, limited and filtered by status if specified
+    logs_list = [format_log(log) for log in log_store.recent(limit, status_filter)]
+    
+    # Summary stats over the whole retained history
+    summary = log_store.summary()
+    total_logs = summary["total_requests"]
+    summary["success_rate"] = round(summary["success_count"] / total_logs * 100, 2) if total_logs > 0 else 0
+    return {"logs": logs_list, "summary": summary}
+
+# Evidently takes seconds, so drift is computed over the log up to the last
+# multiple of drift_refresh_rows and reused until the log passes the next one
+# or the model version changes. The result depends only on the shared log
+# store, so every worker returns the same drift for the same log.
+_drift_cache = (None, None)  # ((model_version, until), data)
+drift_lock = threading.Lock()
+
+def drift_until(log_version):
+    refresh = max(int(log_config.get("drift_refresh_rows", 50)), 1)
+    # Below one refresh step every new prediction counts (the first report needs only 5)
+    return log_version if log_version < refresh else log_version - log_version % refresh
+
+def build_drift_data(state):
+    """Drift analysis of the latest logged inputs, returns (data, log version it covers)"""
+    global _drift_cache
+    until = drift_until(log_store.version())
+    key = (state["model_version"], until)
+    cached_key, data = _drift_cache
+    hit = cached_key == key
+    telemetry.record_cache("drift", hit)
+    if hit:
+        return data, until
+
+    with drift_lock:
+        # Another request may have refreshed it while this one waited
+        cached_key, data = _drift_cache
+        if cached_key == key:
+            return data, until
+
+        # Inputs of the latest successful predictions from the log store
+        current_data = log_store.feature_frame(log_config.get("drift_window", 1000), until=until)
+        
+        # Use Evidently-based drift detection
+        drift_analysis = calculate_drift_evidently(current_data, state["reference_data"], state["reference_stats"])
+        data = drift_analysis or {
+            "overall_status": "insufficient_data",
+            "message": "Minimal 5 prediksi berhasil diperlukan untuk analisis drift",
+            "current_samples": len(current_data)
+        }
+        if drift_analysis and drift_analysis.get("features"):
+            data["chart"] = build_drift_chart(drift_analysis["features"])
+        
+        # Version id of this result, lets clients memoize what they derive from it
+        data["version"] = hashlib.sha1(str(key).encode()).hexdigest()[:12]
+        _drift_cache = (key, data)
+        return data, until
+
 @app.route('/metrics', methods=['GET'])
 def get_metrics():
     try:
-        # Resolve metrics.json relative to this file
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        metrics_path = os.path.join(base_dir, "models", "metrics.json")
-        
-        if os.path.exists(metrics_path):
-            import json
-            with open(metrics_path, "r") as f:
-                metrics = json.load(f)
+        metrics = build_metrics_data(serving)
+        if metrics is not None:
             return jsonify({"status": "success", "data": metrics})
         else:
             return jsonify({"status": "error", "message": "Metrics not found"}), 404
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/admin/dashboard', methods=['GET'])
+def get_dashboard():
+    """Metrics, a page of logs with summary and the cached drift analysis in one response"""
+    try:
+        limit = request.args.get('limit', 50, type=int)
+        state = serving
+        drift, drift_until_version = build_drift_data(state)
+        
+        # The ETag is derived from the versions of every part, so an unchanged
+        # dashboard is answered with 304 before any of it is serialized. All of
+        # them come from the shared store, so every worker derives the same ETag.
+        metrics_path = os.path.join(state["model_dir"], "metrics.json")
+        metrics_mtime = os.path.getmtime(metrics_path) if os.path.exists(metrics_path) else None
+        version_key = f"{state['model_version']}|{metrics_mtime}|{log_store.version()}|{log_store.dropped()}|{drift['version']}|{limit}"
+        etag = hashlib.sha1(version_key.encode()).hexdigest()[:16]
+        if etag in request.if_none_match:
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        
+        response = jsonify({
+            "status": "success",
+            "data": {
+                "metrics": build_metrics_data(state),
+                "logs": build_logs_data(limit),
+                "drift": drift,
+                "drift_log_version": drift_until_version
+            }
+        })
+        response.set_etag(etag)
+        return response
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/admin/reload', methods=['POST'])
+def reload_models():
+    """Load the current registry version (e.g. after `registry.py use <version>`) without a restart"""
+    if not profiler.is_admin(request.headers.get("X-Admin-Token")):
+        return jsonify({"status": "error", "message": "Admin token required"}), 403
+    previous = serving["model_version"]
+    state = reload_serving_state()
+    return jsonify({
+        "status": "success",
+        "previous_version": previous,
+        "model_version": state["model_version"],
+        "active_model": state["active_slot"],
+        "models": list(state["models"])
+    })
+
+@app.route('/metrics/runtime', methods=['GET'])
+def get_runtime_metrics():
+    """Request/stage latency histograms, counters and process stats in Prometheus text format"""
+    body = telemetry.render({
+        "house_api_models_loaded": len(serving["models"]),
+        "house_api_prediction_log_entries": len(log_store),
+        "house_api_prediction_log_store_bytes": log_store.nbytes,
+        "house_api_prediction_log_queue_depth": len(log_writer),
+        "house_api_predict_batch_queue_depth": len(batcher) if batcher is not None else 0,
+        "house_api_ready": int(is_ready(serving))
+    }, extra_counters={
+        "house_api_prediction_log_dropped_total": log_writer.dropped,
+        "house_api_prediction_log_write_errors_total": log_writer.write_errors
+    })
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
 @app.route('/logs', methods=['GET'])
 def get_logs():
     """Get prediction logs with optional filtering"""
@@ -522,31 +1095,9 @@ def get_logs():
         limit = request.args.get('limit', 50, type=int)
         status_filter = request.args.get('status', None)
         
-        logs_list = list(prediction_logs)
-        
-        # Filter by status if specified
-        if status_filter:
-            logs_list = [log for log in logs_list if log["status"] == status_filter]
-        
-        # Return most recent first, limited
-        logs_list = logs_list[-limit:][::-1]
-        
-        # Calculate summary stats
-        total_logs = len(prediction_logs)
-        success_count = sum(1 for log in prediction_logs if log["status"] == "success")
-        error_count = total_logs - success_count
-        
         return jsonify({
             "status": "success",
-            "data": {
-                "logs": logs_list,
-                "summary": {
-                    "total_requests": total_logs,
-                    "success_count": success_count,
-                    "error_count": error_count,
-                    "success_rate": round(success_count / total_logs * 100, 2) if total_logs > 0 else 0
-                }
-            }
+            "data": build_logs_data(limit, status_filter)
         })
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -555,27 +1106,16 @@ def get_logs():
 def get_drift():
     """Get data drift analysis using Evidently"""
     try:
-        recent_logs = list(prediction_logs)
-        
-        # Use Evidently-based drift detection
-        drift_analysis = calculate_drift_evidently(recent_logs)
-        
-        if drift_analysis:
-            return jsonify({
-                "status": "success",
-                "data": drift_analysis
-            })
-        else:
-            return jsonify({
-                "status": "success",
-                "data": {
-                    "overall_status": "insufficient_data",
-                    "message": "Minimal 5 prediksi berhasil diperlukan untuk analisis drift",
-                    "current_samples": len([l for l in recent_logs if l.get("status") == "success"])
-                }
-            })
+        drift, _ = build_drift_data(serving)
+        return jsonify({
+            "status": "success",
+            "data": drift
+        })
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+# Warm up in the background so /healthz answers while the models warm up
+threading.Thread(target=warm_up_serving_state, name="warm-up", daemon=True).start()
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000)
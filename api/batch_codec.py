@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+# Binary request/response bodies for /predict/batch, chosen by Content-Type
+# (request) and Accept (response). JSON stays the default; the binary formats
+# skip JSON parsing and per-row dicts for high-volume internal callers:
+#   ARROW    an Arrow IPC stream with one int column per predictor; the response
+#            is a stream with a float64 "prediction" column (model_used and
+#            model_version in the schema metadata)
+#   MSGPACK  {"instances": [{...}, ...]} like JSON, or columnar {"LB": [...], ...};
+#            the response is the JSON body encoded as MessagePack
+# pyarrow and msgpack are pinned in requirements.txt; an environment without
+# them still serves JSON and answers 415 for the binary format.
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "application/json"
+ARROW = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/msgpack"
+MIMETYPES = {
+    JSON: JSON,
+    ARROW: ARROW,
+    "application/x-msgpack": MSGPACK,
+    MSGPACK: MSGPACK
+}
+
+class UnsupportedFormat(Exception):
+    """Unknown media type, or its optional dependency is not installed (HTTP 415)"""
+
+def request_format(mimetype):
+    fmt = MIMETYPES.get(mimetype or JSON)
+    if fmt is None:
+        raise UnsupportedFormat(f"Unsupported Content-Type: {mimetype} (expected {', '.join(sorted(set(MIMETYPES.values())))})")
+    _require(fmt)
+    return fmt
+
+def response_format(accept_mimetypes, request_fmt):
+    """Format named in Accept; a missing or */* Accept answers in the request's format"""
+    if not accept_mimetypes or accept_mimetypes.best == "*/*":
+        return request_fmt
+    fmt = MIMETYPES.get(accept_mimetypes.best_match(list(MIMETYPES)))
+    if fmt is None:
+        raise UnsupportedFormat(f"Cannot produce any of: {accept_mimetypes}")
+    _require(fmt)
+    return fmt
+
+def _require(fmt):
+    if fmt == ARROW and pa is None:
+        raise UnsupportedFormat("Arrow support requires pyarrow (pip install pyarrow)")
+    if fmt == MSGPACK and msgpack is None:
+        raise UnsupportedFormat("MessagePack support requires msgpack (pip install msgpack)")
+
+def decode_arrow(body, predictors):
+    """Arrow IPC stream -> int64 feature frame. Columns already int64 without
+    nulls are read from the Arrow buffers without a copy; the only copy is
+    gathering them into the model's feature matrix."""
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Invalid Arrow IPC stream: {e}")
+    missing = [p for p in predictors if p not in table.column_names]
+    if missing:
+        raise ValueError(f"Missing features: {missing}")
+    if table.num_rows == 0:
+        raise ValueError("Expected at least one row")
+
+    columns = []
+    for p in predictors:
+        column = table.column(p)
+        if column.null_count:
+            raise ValueError(f"Feature {p} has {column.null_count} null values")
+        if not pa.types.is_integer(column.type):
+            raise ValueError(f"Feature {p} must be an integer column, got {column.type}")
+        values = column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+        columns.append(values.to_numpy(zero_copy_only=pa.types.is_int64(column.type)).astype(np.int64, copy=False))
+    return pd.DataFrame(np.column_stack(columns), columns=predictors, copy=False)
+
+def decode_msgpack(body):
+    """MessagePack body -> the same structure a JSON body would decode to"""
+    try:
+        return msgpack.unpackb(body)
+    except (msgpack.ExtraData, msgpack.FormatError, msgpack.StackError, ValueError) as e:
+        raise ValueError(f"Invalid MessagePack body: {e}")
+
+def encode_arrow(predictions, model_used, model_version):
+    # float64 predictions become the Arrow column's buffer without a copy
+    batch = pa.record_batch([pa.array(predictions)], names=["prediction"])
+    batch = batch.replace_schema_metadata({
+        "model_used": model_used,
+        "model_version": model_version or "",
+        "count": str(len(predictions))
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+def encode_msgpack(body):
+    return msgpack.packb(body)
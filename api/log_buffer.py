@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+# Columnar ring buffer for prediction logs. One preallocated NumPy array per
+# field instead of a dict per request (~26 bytes per row for five features):
+#   features  int32  (n_features, capacity), each feature row is contiguous
+#   prediction float64 (NaN for failed requests)
+#   ts_ms     int64  epoch milliseconds
+#   status    uint8  STATUS_CODES
+#   model     uint8  index into model_names
+# columns() returns views of the most recent rows; a copy is only made when
+# the requested window wraps around the end of the buffer.
+
+STATUS_CODES = {"success": 0, "error": 1}
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+class ColumnarLogBuffer:
+    def __init__(self, capacity, features):
+        self.capacity = int(capacity)
+        self.feature_names = list(features)
+        self.features = np.zeros((len(self.feature_names), self.capacity), dtype=np.int32)
+        self.prediction = np.full(self.capacity, np.nan, dtype=np.float64)
+        self.ts_ms = np.zeros(self.capacity, dtype=np.int64)
+        self.status = np.zeros(self.capacity, dtype=np.uint8)
+        self.model = np.zeros(self.capacity, dtype=np.uint8)
+        self.model_names = []
+        self._model_ids = {}
+        self._head = 0   # next write position
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.features, self.prediction, self.ts_ms, self.status, self.model))
+
+    def _model_id(self, name):
+        model_id = self._model_ids.get(name)
+        if model_id is None:
+            if len(self.model_names) >= 255:
+                name = "other"
+                model_id = self._model_ids.get(name)
+            if model_id is None:
+                model_id = len(self.model_names)
+                self.model_names.append(name)
+                self._model_ids[name] = model_id
+        return model_id
+
+    def _feature_row(self, record):
+        # Failed requests may carry invalid input (even a non-object JSON body
+        # or values beyond int32), those values are stored as zeros
+        values = record.get("input")
+        if not isinstance(values, dict):
+            values = {}
+        row = []
+        for f in self.feature_names:
+            try:
+                value = int(values.get(f, 0))
+            except (TypeError, ValueError, OverflowError):
+                value = 0
+            row.append(value if INT32_MIN <= value <= INT32_MAX else 0)
+        return row
+
+    def append_batch(self, records):
+        """Append log records (dicts as built by log_prediction); single writer only"""
+        n = len(records)
+        if n == 0:
+            return
+        if n > self.capacity:
+            records = records[-self.capacity:]
+            n = self.capacity
+
+        idx = (self._head + np.arange(n)) % self.capacity
+        self.features[:, idx] = np.array([self._feature_row(r) for r in records], dtype=np.int32).T
+        self.prediction[idx] = [np.nan if r.get("prediction") is None else r["prediction"] for r in records]
+        self.ts_ms[idx] = [r["ts_ms"] for r in records]
+        self.status[idx] = [STATUS_CODES.get(r.get("status"), STATUS_CODES["error"]) for r in records]
+        self.model[idx] = [self._model_id(r.get("model_used", "Unknown")) for r in records]
+
+        self._head = (self._head + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def _window(self, array, n, skip):
+        # n entries along the last axis ending `skip` entries before the newest, oldest first
+        end = self._head - skip
+        start = end - n
+        if start >= 0:
+            return array[..., start:end]
+        if end <= 0:
+            return array[..., start + self.capacity:end + self.capacity]
+        return np.concatenate([array[..., start + self.capacity:], array[..., :end]], axis=-1)
+
+    def columns(self, last=None, skip=0):
+        """Dict of the most recent `last` rows (default: all) per column, leaving
+        out the newest `skip` rows"""
+        skip = min(max(int(skip), 0), self._size)
+        n = self._size - skip if last is None else min(int(last), self._size - skip)
+        return {
+            "features": self._window(self.features, n, skip),
+            "prediction": self._window(self.prediction, n, skip),
+            "ts_ms": self._window(self.ts_ms, n, skip),
+            "status": self._window(self.status, n, skip),
+            "model": self._window(self.model, n, skip)
+        }
+
+    def feature_frame(self, last=None, status="success", skip=0):
+        """DataFrame of the input features of the most recent rows with the given
+        status. It may share memory with the buffer: copy it before the next write."""
+        cols = self.columns(last, skip)
+        features = cols["features"]
+        mask = cols["status"] == STATUS_CODES[status]
+        if not mask.all():
+            features = features[:, mask]
+        # (n_features, n) -> n x n_features frame
+        return pd.DataFrame(features.T, columns=self.feature_names, copy=False)
+
+    def summary(self):
+        status = self.status[:self._size]
+        model = self.model[:self._size]
+        success = int(np.count_nonzero(status == STATUS_CODES["success"]))
+        counts = np.bincount(model, minlength=len(self.model_names))
+        return {
+            "total_requests": self._size,
+            "success_count": success,
+            "error_count": self._size - success,
+            "model_counts": {name: int(counts[i]) for i, name in enumerate(self.model_names) if counts[i]}
+        }
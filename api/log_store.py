@@ -0,0 +1,194 @@
+import os
+import json
+import sqlite3
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+import log_buffer
+
+# Where the prediction log lives. Every store offers the same operations:
+#   write_batch(entries, dropped)    called by the background log writer, with the
+#                                    number of records its queue dropped since the last batch
+#   recent(limit, status)            newest full entries first, for /logs
+#   summary()                        request and dropped counts over the retained history
+#   feature_frame(last, until)       inputs of the latest successful requests up to
+#                                    log version `until`, for /drift
+#   version()                        changes whenever entries are written (cache keys, ETags)
+#   dropped()                        records dropped by every writer of the store
+#
+# MemoryLogStore keeps everything in this process (one worker).
+# SQLiteLogStore keeps it in a WAL-mode SQLite file that every API worker on
+# the host writes to and reads from, so /logs and /drift agree across workers.
+
+class MemoryLogStore:
+    def __init__(self, features, history_size, recent_size):
+        self.recent_entries = deque(maxlen=recent_size)  # full entries (details, errors)
+        self.history = log_buffer.ColumnarLogBuffer(history_size, features)
+        self.lock = threading.Lock()
+        self.written = 0
+        self.dropped_count = 0
+
+    def __len__(self):
+        return len(self.history)
+
+    @property
+    def nbytes(self):
+        return self.history.nbytes
+
+    def write_batch(self, entries, dropped=0):
+        with self.lock:
+            # History first: if a record cannot be stored, /logs does not show
+            # entries that the summary and drift never saw
+            self.history.append_batch(entries)
+            self.recent_entries.extend(entries)
+            self.written += len(entries)
+            self.dropped_count += dropped
+
+    def recent(self, limit, status=None):
+        with self.lock:
+            entries = list(self.recent_entries)
+        if status:
+            entries = [e for e in entries if e["status"] == status]
+        return entries[-limit:][::-1] if limit > 0 else []
+
+    def summary(self):
+        with self.lock:
+            return dict(self.history.summary(), dropped_count=self.dropped_count)
+
+    def version(self):
+        return self.written
+
+    def dropped(self):
+        return self.dropped_count
+
+    def feature_frame(self, last, until=None):
+        # Copied under the lock (a few KB): callers use it outside the lock
+        with self.lock:
+            # Versions count written entries, so the rows after `until` are the newest ones
+            skip = self.written - until if until is not None else 0
+            return self.history.feature_frame(last, skip=skip).copy()
+
+class SQLiteLogStore:
+    def __init__(self, path, features, history_size, recent_size):
+        self.path = path
+        self.features = list(features)
+        self.history_size = int(history_size)
+        self.recent_size = recent_size
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        columns = ", ".join(f'"{f}" INTEGER' for f in self.features)
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS predictions ("
+                f"id INTEGER PRIMARY KEY AUTOINCREMENT, ts_ms INTEGER, {columns}, "
+                f"prediction REAL, status TEXT, model_used TEXT, entry TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_predictions_status ON predictions (status, id)")
+            conn.execute("CREATE TABLE IF NOT EXISTS log_counters (name TEXT PRIMARY KEY, value INTEGER)")
+            conn.execute("INSERT OR IGNORE INTO log_counters (name, value) VALUES ('dropped', 0)")
+
+    def _conn(self):
+        # sqlite3 connections are per thread; WAL lets readers run while a worker writes
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+    @property
+    def nbytes(self):
+        return sum(os.path.getsize(p) for p in (self.path, self.path + "-wal") if os.path.exists(p))
+
+    def _feature_value(self, entry, feature):
+        # NULL for invalid input, including a request body that is not a JSON object
+        # and values beyond int32 (SQLite rejects ints beyond int64 for the whole batch)
+        values = entry.get("input")
+        if not isinstance(values, dict):
+            return None
+        try:
+            value = int(values.get(feature, 0))
+        except (TypeError, ValueError, OverflowError):
+            return None
+        return value if log_buffer.INT32_MIN <= value <= log_buffer.INT32_MAX else None
+
+    def write_batch(self, entries, dropped=0):
+        rows = [
+            (e["ts_ms"], *[self._feature_value(e, f) for f in self.features],
+             e.get("prediction"), e.get("status"), e.get("model_used"), json.dumps(e))
+            for e in entries
+        ]
+        placeholders = ", ".join("?" * (len(self.features) + 5))
+        columns = ", ".join(f'"{f}"' for f in self.features)
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                f"INSERT INTO predictions (ts_ms, {columns}, prediction, status, model_used, entry) VALUES ({placeholders})",
+                rows
+            )
+            # Retention: keep the newest history_size rows (ids are monotonic across workers)
+            conn.execute(
+                "DELETE FROM predictions WHERE id <= (SELECT MAX(id) FROM predictions) - ?",
+                (self.history_size,)
+            )
+            if dropped:
+                conn.execute("UPDATE log_counters SET value = value + ? WHERE name = 'dropped'", (dropped,))
+
+    def recent(self, limit, status=None):
+        limit = min(limit, self.recent_size)
+        if status:
+            cursor = self._conn().execute(
+                "SELECT entry FROM predictions WHERE status = ? ORDER BY id DESC LIMIT ?", (status, limit))
+        else:
+            cursor = self._conn().execute("SELECT entry FROM predictions ORDER BY id DESC LIMIT ?", (limit,))
+        return [json.loads(row[0]) for row in cursor]
+
+    def summary(self):
+        conn = self._conn()
+        model_counts = dict(conn.execute("SELECT model_used, COUNT(*) FROM predictions GROUP BY model_used"))
+        total = sum(model_counts.values())
+        success = conn.execute("SELECT COUNT(*) FROM predictions WHERE status = 'success'").fetchone()[0]
+        return {
+            "total_requests": total,
+            "success_count": success,
+            "error_count": total - success,
+            "model_counts": model_counts,
+            "dropped_count": self.dropped()
+        }
+
+    def version(self):
+        # Row ids only grow, across every worker writing to the file
+        return self._conn().execute("SELECT MAX(id) FROM predictions").fetchone()[0] or 0
+
+    def dropped(self):
+        return self._conn().execute("SELECT value FROM log_counters WHERE name = 'dropped'").fetchone()[0]
+
+    def feature_frame(self, last, until=None):
+        columns = ", ".join(f'"{f}"' for f in self.features)
+        # Ids are committed in order, so every worker sees the same rows up to `until`
+        until = self.version() if until is None else int(until)
+        rows = self._conn().execute(
+            f"SELECT {columns} FROM predictions WHERE status = 'success' AND id <= ? ORDER BY id DESC LIMIT ?",
+            (until, int(last))
+        ).fetchall()
+        values = np.array(rows[::-1], dtype=np.int32).reshape(len(rows), len(self.features))
+        return pd.DataFrame(values, columns=self.features)
+
+def create_log_store(log_config, features, base_dir, recent_size):
+    backend = log_config.get("backend", "memory")
+    history_size = log_config.get("history_size", 200000)
+    if backend == "sqlite":
+        path = os.path.join(base_dir, log_config.get("sqlite_path", "logs/predictions.db"))
+        return SQLiteLogStore(path, features, history_size, recent_size)
+    if backend != "memory":
+        raise ValueError(f"Unknown prediction log backend: {backend} (expected memory or sqlite)")
+    return MemoryLogStore(features, history_size, recent_size)
@@ -0,0 +1,75 @@
+import os
+import json
+import util as utils
+
+# Loading and selecting the trained models of one model directory (a registry
+# version or the legacy models/ folder). Shared by the API (app.py) and the
+# offline scoring CLI (scripts/score.py) so both serve the same model.
+
+DEFAULT_MODEL_NAMES = {"model1": "Linear Regression", "model2": "Random Forest"}
+
+def model_label(slot, model_metadata):
+    # "model2" + "Random Forest Regressor" -> "Model 2 (Random Forest)"
+    name = model_metadata.get(slot, {}).get("name", DEFAULT_MODEL_NAMES.get(slot, slot))
+    if name.endswith(" Regressor"):
+        name = name[:-len(" Regressor")]
+    return f"Model {slot[len('model'):]} ({name})"
+
+def selection_score(metadata, selection):
+    return selection.get("r2_weight", 1.0) * metadata.get("r2", 0) - selection.get("mape_weight", 0.0) * metadata.get("mape", 0)
+
+def within_budget(metadata, selection):
+    latency_budget = selection.get("latency_budget_ms")
+    size_budget = selection.get("size_budget_mb")
+    if latency_budget is not None and metadata.get("latency_ms", 0) > latency_budget:
+        return False
+    if size_budget is not None and metadata.get("size_bytes", 0) > size_budget * 1024 * 1024:
+        return False
+    return True
+
+def select_active_model(models, model_metadata, selection):
+    """Pick the serving model: best R2/MAPE score among the models within the latency/size budget"""
+    slots = list(models)
+    if not slots:
+        return None
+    eligible = [s for s in slots if within_budget(model_metadata.get(s, {}), selection)] or slots
+    # max() keeps the first (lowest numbered) model on ties
+    return max(eligible, key=lambda s: selection_score(model_metadata.get(s, {}), selection))
+
+def load_model_metadata(model_dir):
+    """Per-slot entries of metrics.json ({} if the directory has none)"""
+    metrics_path = os.path.join(model_dir, "metrics.json")
+    if not os.path.exists(metrics_path):
+        return {}
+    with open(metrics_path, 'r') as f:
+        metrics_data = json.load(f)
+    # Parse structure: could be old (flat) or new (nested)
+    if "model1" in metrics_data:
+        return {k: v for k, v in metrics_data.items() if k.startswith("model") and isinstance(v, dict)}
+    # Old format
+    return {"model1": {"r2": metrics_data.get("r2", 0), "mape": metrics_data.get("mape", 0)}}
+
+def load_models(model_dir, legacy_dir=None, slots=None):
+    """Load model_1.pkl, model_2.pkl, ... as {"model1": ..., "model2": ...}.
+    legacy_dir/production_model.pkl stands in for a missing model 1. Pass
+    `slots` to load only some of the models."""
+    model_metadata = load_model_metadata(model_dir)
+    model_files = sorted(
+        (f for f in os.listdir(model_dir) if f.startswith("model_") and f.endswith(".pkl")),
+        key=lambda f: int(f[len("model_"):-len(".pkl")])
+    )
+    models = {}
+    for file_name in model_files:
+        slot = "model" + file_name[len("model_"):-len(".pkl")]
+        if slots is not None and slot not in slots:
+            continue
+        models[slot] = utils.pickle_load(os.path.join(model_dir, file_name))
+        print(f"{model_label(slot, model_metadata)} loaded.")
+
+    # Also load the old production_model if model 1 is missing, for backward compatibility
+    if "model1" not in models and legacy_dir and (slots is None or "model1" in slots):
+        prod_path = os.path.join(legacy_dir, "production_model.pkl")
+        if os.path.exists(prod_path):
+            models = {"model1": utils.pickle_load(prod_path), **models}
+            print("Legacy Production Model loaded as Model 1.")
+    return models, model_metadata
@@ -0,0 +1,121 @@
+import time
+import atexit
+import threading
+from collections import deque
+
+# Prediction logging off the request thread: log_prediction() only appends a
+# record to a bounded in-memory queue, a background writer drains it in
+# batches and hands each batch to the sink (in-memory log, JSONL file, ...).
+# deque.append/popleft are atomic in CPython, so producers only take a lock
+# to update the counters (`+=` on an attribute is not atomic).
+
+DROP = "drop"      # queue full: discard the new record
+SAMPLE = "sample"  # queue full: keep every n-th new record, evicting the oldest queued one
+BLOCK = "block"    # queue full: wait up to block_timeout for the writer, then discard
+POLICIES = (DROP, SAMPLE, BLOCK)
+
+class AsyncLogWriter:
+    def __init__(self, sink, capacity=10000, batch_size=256, flush_interval=0.05,
+                 policy=DROP, sample_every=10, block_timeout=0.1):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy} (expected one of {POLICIES})")
+        self.sink = sink
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.sample_every = max(int(sample_every), 1)
+        self.block_timeout = block_timeout
+
+        self.accepted = 0
+        self.dropped = 0
+        self._dropped_reported = 0
+        self.write_errors = 0
+        self._overflows = 0
+        self._counter_lock = threading.Lock()
+        self._pending = deque()
+        self._writing = False
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="prediction-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def submit(self, record):
+        """Queue one record; returns False if it was dropped by the overflow policy"""
+        if len(self._pending) >= self.capacity and not self._make_room():
+            with self._counter_lock:
+                self.dropped += 1
+            return False
+        self._pending.append(record)
+        with self._counter_lock:
+            self.accepted += 1
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def take_dropped(self):
+        """Records dropped since the previous call, for a sink that keeps a shared count"""
+        with self._counter_lock:
+            dropped = self.dropped - self._dropped_reported
+            self._dropped_reported = self.dropped
+        return dropped
+
+    def _make_room(self):
+        if self.policy == BLOCK:
+            deadline = time.perf_counter() + self.block_timeout
+            self._wake.set()
+            while len(self._pending) >= self.capacity:
+                if time.perf_counter() >= deadline:
+                    return False
+                time.sleep(0.0005)
+            return True
+        if self.policy == SAMPLE:
+            with self._counter_lock:
+                self._overflows += 1
+                keep = self._overflows % self.sample_every == 0
+            if keep:
+                try:
+                    self._pending.popleft()
+                except IndexError:
+                    pass
+                else:
+                    with self._counter_lock:
+                        self.dropped += 1
+                return True
+        return False
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+
+    def _drain(self):
+        self._writing = True
+        try:
+            while self._pending:
+                batch = []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._pending.popleft())
+                    except IndexError:
+                        break
+                if batch:
+                    try:
+                        self.sink(batch)
+                    except Exception as e:
+                        self.write_errors += 1
+                        print(f"Prediction log write failed: {e}")
+        finally:
+            self._writing = False
+
+    def flush(self, timeout=5.0):
+        """Wait until every queued record has reached the sink"""
+        deadline = time.perf_counter() + timeout
+        self._wake.set()
+        while (self._pending or self._writing) and time.perf_counter() < deadline:
+            time.sleep(0.001)
+        return not self._pending
@@ -1,9 +1,12 @@
 import util as utils
 import pandas as pd
+import numpy as np
+import os
+import sys
 
-def ambil_data():
-    X_train = utils.pickle_load(str(utils.dir_parent()) + utils.cek_path_os(konfig["train_set_path"][0]))
-    y_train = utils.pickle_load(str(utils.dir_parent()) + utils.cek_path_os(konfig["train_set_path"][1]))
+def ambil_data(konfig, root_dir):
+    X_train = utils.pickle_load(os.path.join(root_dir, konfig["train_set_path"][0]))
+    y_train = utils.pickle_load(os.path.join(root_dir, konfig["train_set_path"][1]))
     
     train_set = pd.concat([X_train, y_train], axis = 1)
     
@@ -16,19 +19,24 @@ def cek_outlier(dataset, pengkali):
     
     return data_outlier
     
-def cek_data(dataset, kolom, rentang, pengkali):
-    #fungsi ini awal2 akan memecah dataset dalam beberapa bagian sesuai rentang yang dimasukkan
-    #kemudian akan dicek outliernya pada masing-masing blok tersebut
-    data_outlier = pd.DataFrame()
+def tandai_outlier(dataset, kolom, rentang, pengkali):
+    #dataset dipecah menjadi blok selebar rentang berdasarkan kolom, lalu outlier HARGA
+    #dicek per blok dengan IQR. semua blok dihitung sekaligus lewat groupby
     blok = int(dataset[kolom].max() / rentang)
-    for i in range (1, blok):
-        data_blok = dataset[dataset[kolom] < rentang * i]
-        data_blok_cek_outlier = cek_outlier(data_blok, pengkali)
-        data_outlier = pd.concat([data_outlier, data_blok_cek_outlier])
-        #mengeluarkan data_blok dari dataset lama
-        dataset = dataset[~dataset.index.isin(data_blok.index)]
-    cek_outlier(dataset, pengkali)    
-    return data_outlier
+    id_blok = np.floor_divide(dataset[kolom].to_numpy(), rentang).clip(min = 0)
+    
+    kuartil = dataset["HARGA"].groupby(id_blok).quantile([0.25, 0.75]).unstack().reindex(id_blok)
+    q1 = kuartil[0.25].to_numpy()
+    q3 = kuartil[0.75].to_numpy()
+    batas_atas = q3 + pengkali * (q3 - q1)
+    
+    #blok terakhir (kolom >= rentang * (blok - 1)) tidak ikut dicek, sama seperti versi loop
+    dicek = id_blok < blok - 1
+    
+    return pd.Series(dicek & (dataset["HARGA"].to_numpy() > batas_atas), index = dataset.index)
+    
+def cek_data(dataset, kolom, rentang, pengkali):
+    return dataset[tandai_outlier(dataset, kolom, rentang, pengkali)]
     
 def hapus_outlier(dataset, outlier):
     try: 
@@ -36,18 +44,35 @@ def hapus_outlier(dataset, outlier):
     except:
         return dataset
     
-if __name__ == "__main__":
+def bersihkan_data(konfig, root_dir, force: bool = False):
+    #tahap cleaning: hapus outlier blok LB dan LT dari train set
+    #di-skip jika input pickle dan parameter blok tidak berubah sejak run terakhir
+    deps, outs, params = utils.stage_spec(konfig, "clean", root_dir)
+    lock_path = os.path.join(root_dir, konfig["pipeline_lock_path"])
     
-    konfig = utils.load_params(str(utils.dir_parent()) + utils.get_params())
+    fingerprint = utils.stage_fingerprint(deps, params)
+    if not force and utils.stage_is_fresh(lock_path, "clean", fingerprint, outs):
+        print("Clean stage up to date, skipping.")
+        return False
     
-    train_set = ambil_data()
+    train_set = ambil_data(konfig, root_dir)
     
     outlier_LB = cek_data(train_set, "LB", konfig["blok_LB"][0], konfig["blok_LB"][1])
     outlier_LT = cek_data(train_set, "LT", konfig["blok_LT"][0], konfig["blok_LT"][1])
     
     train_set_clean = hapus_outlier(train_set, outlier_LB)
     train_set_clean = hapus_outlier(train_set_clean, outlier_LT)
+    print(f"Removed {len(train_set) - len(train_set_clean)} outliers ({len(train_set_clean)} rows left).")
     
-    utils.pickle_dump(train_set_clean[konfig["prediktor"]], str(utils.dir_parent()) + utils.cek_path_os(konfig["train_clean_set_path"][0]))
-    utils.pickle_dump(train_set_clean[konfig["label"]], str(utils.dir_parent()) + utils.cek_path_os(konfig["train_clean_set_path"][1]))
-
+    utils.pickle_dump(train_set_clean[konfig["prediktor"]], os.path.join(root_dir, konfig["train_clean_set_path"][0]))
+    utils.pickle_dump(train_set_clean[konfig["label"]], os.path.join(root_dir, konfig["train_clean_set_path"][1]))
+    
+    utils.save_stage_lock(lock_path, "clean", fingerprint, outs)
+    print("Clean stage complete. Pickles updated.")
+    return True
+    
+if __name__ == "__main__":
+    config_path = utils.get_config_path()
+    konfig = utils.load_params(config_path)
+    
+    bersihkan_data(konfig, utils.get_root_dir(config_path), force = "--force" in sys.argv)
@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import hmac
+import pstats
+import cProfile
+import threading
+from io import StringIO
+from collections import Counter
+
+# On-demand profiling for the API. Nothing here runs until an admin asks for it:
+#   - sample(): a sampling profiler thread that walks every thread's stack at a
+#     fixed interval for N seconds and returns collapsed stacks
+#     ("a;b;c <count>" per line, input for flamegraph.pl / speedscope)
+#   - RequestProfile: cProfile around a single request (X-Profile header)
+
+ADMIN_TOKEN_ENV = "ADMIN_TOKEN"
+MAX_SECONDS = 60
+
+_sampling = threading.Lock()
+# Python allows a single active cProfile at a time (sys.monitoring since 3.12)
+_request_profiling = threading.Lock()
+
+def is_admin(token):
+    # Profiling is disabled entirely unless ADMIN_TOKEN is set
+    expected = os.environ.get(ADMIN_TOKEN_ENV)
+    if not expected or not token:
+        return False
+    return hmac.compare_digest(token.encode(), expected.encode())
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+def _collapse(frame):
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+def sample(seconds, interval=0.005):
+    """Sample all other threads for `seconds`. Returns (collapsed stacks, number
+    of samples), or None if a sampling profile is already running"""
+    if not _sampling.acquire(blocking=False):
+        return None
+    try:
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        stacks = Counter()
+        samples = 0
+        deadline = time.perf_counter() + min(seconds, MAX_SECONDS)
+        while time.perf_counter() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != me:
+                    stacks[f"{names.get(thread_id, thread_id)};{_collapse(frame)}"] += 1
+            samples += 1
+            time.sleep(interval)
+    finally:
+        _sampling.release()
+
+    lines = [f"{stack} {count}" for stack, count in stacks.most_common()]
+    return "\n".join(lines) + "\n", samples
+
+class RequestProfile:
+    """cProfile for one request; report() returns the top functions by cumulative time"""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    @classmethod
+    def start(cls):
+        # None when another request is already being profiled
+        if not _request_profiling.acquire(blocking=False):
+            return None
+        try:
+            return cls()
+        except ValueError:
+            _request_profiling.release()
+            return None
+
+    def report(self, limit=40):
+        self.profile.disable()
+        _request_profiling.release()
+        out = StringIO()
+        pstats.Stats(self.profile, stream=out).strip_dirs().sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
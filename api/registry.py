@@ -0,0 +1,133 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+from datetime import datetime
+from numpy.lib import recfunctions
+from joblib.hashing import NumpyHasher
+import util as utils
+
+# Local model registry:
+#   <registry_dir>/<version>/   immutable, content-addressed artifacts
+#                               (model_<n>.pkl, metrics.json, reference.pkl,
+#                               schema.json, manifest.json)
+#   <registry_dir>/CURRENT      version served by the API, swapped atomically
+#
+# The version id hashes the models, reference.pkl and schema.json only:
+# metrics.json carries timestamps and timings that differ on every run, so
+# retraining identical models would otherwise publish a new version.
+
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+UNVERSIONED_FILES = {MANIFEST_FILE, "metrics.json"}
+
+class _ContentHasher(NumpyHasher):
+    def save(self, obj):
+        # sklearn tree nodes are a structured array whose padding bytes are
+        # never initialized, so hash the fields only
+        if isinstance(obj, self.np.ndarray) and obj.dtype.names:
+            obj = recfunctions.repack_fields(obj)
+        super().save(obj)
+
+def content_hash(file_path):
+    """Hash of what an artifact holds. Pickles are hashed after loading: the
+    pickle bytes of an identical forest differ from run to run."""
+    if file_path.endswith(".pkl"):
+        return _ContentHasher(hash_name="sha256").hash(utils.pickle_load(file_path))
+    return utils.hash_file(file_path)
+
+def get_registry_dir(config):
+    # Registry path in params.yaml is relative to the api folder, like production_model_path
+    return os.path.join(utils.BASE_DIR, config.get("registry_dir", "models/registry"))
+
+def version_dir(registry_dir, version):
+    return os.path.join(registry_dir, version)
+
+def current_version(registry_dir):
+    path = os.path.join(registry_dir, CURRENT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        version = f.read().strip()
+    return version if version and os.path.isdir(version_dir(registry_dir, version)) else None
+
+def set_current(registry_dir, version):
+    if not os.path.isdir(version_dir(registry_dir, version)):
+        raise ValueError(f"Unknown model version: {version}")
+    # Write-then-rename so readers never see a partially written pointer
+    tmp_path = os.path.join(registry_dir, CURRENT_FILE + ".tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(registry_dir, CURRENT_FILE))
+
+def load_manifest(registry_dir, version):
+    with open(os.path.join(version_dir(registry_dir, version), MANIFEST_FILE), 'r') as f:
+        return json.load(f)
+
+def list_versions(registry_dir):
+    if not os.path.isdir(registry_dir):
+        return []
+    manifests = []
+    for name in os.listdir(registry_dir):
+        if os.path.exists(os.path.join(registry_dir, name, MANIFEST_FILE)):
+            manifests.append(load_manifest(registry_dir, name))
+    return sorted(manifests, key=lambda m: m["created"])
+
+def prune(registry_dir, keep):
+    # Drop the oldest versions beyond `keep`, never the current one
+    current = current_version(registry_dir)
+    versions = [m["version"] for m in list_versions(registry_dir)]
+    for version in versions[:max(len(versions) - keep, 0)]:
+        if version != current:
+            shutil.rmtree(version_dir(registry_dir, version))
+
+def publish(registry_dir, staging_dir, keep=None):
+    """Move a fully written staging directory into the registry under its
+    content hash and point CURRENT at it. Returns the version id."""
+    files = sorted(f for f in os.listdir(staging_dir) if f != MANIFEST_FILE)
+    hashes = {f: utils.hash_file(os.path.join(staging_dir, f)) for f in files}
+    content = {f: content_hash(os.path.join(staging_dir, f)) for f in files if f not in UNVERSIONED_FILES}
+    version = utils.stage_fingerprint([], content)[:12]
+
+    os.makedirs(registry_dir, exist_ok=True)
+    target = version_dir(registry_dir, version)
+    if os.path.isdir(target):
+        # Same content already published, artifacts are never rewritten
+        shutil.rmtree(staging_dir)
+    else:
+        manifest = {
+            "version": version,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "files": hashes
+        }
+        with open(os.path.join(staging_dir, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=4)
+        os.replace(staging_dir, target)
+
+    set_current(registry_dir, version)
+    if keep:
+        prune(registry_dir, keep)
+    return version
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the local model registry or roll back")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="list published versions")
+    use = sub.add_parser("use", help="point CURRENT at an existing version (rollback)")
+    use.add_argument("version")
+    args = parser.parse_args()
+
+    registry_dir = get_registry_dir(utils.load_params(utils.get_config_path()))
+    if args.command == "list":
+        current = current_version(registry_dir)
+        for manifest in list_versions(registry_dir):
+            mark = "*" if manifest["version"] == current else " "
+            print(f"{mark} {manifest['version']}  {manifest['created']}  {', '.join(manifest['files'])}")
+    else:
+        try:
+            set_current(registry_dir, args.version)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"CURRENT -> {args.version} (restart the API or POST /admin/reload to serve it)")
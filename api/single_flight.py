@@ -0,0 +1,41 @@
+import threading
+from concurrent.futures import Future
+
+# Single-flight deduplication: concurrent callers with the same key share one
+# in-flight computation instead of each running it. Nothing is kept once the
+# computation finishes, so unlike a cache there is no staleness to manage.
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def __len__(self):
+        return len(self._calls)
+
+    def do(self, key, fn):
+        """Run fn() once for all concurrent callers with this key. Returns
+        (result, shared); shared is True for callers that joined another's call.
+        Exceptions of fn() are raised in every caller."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key)
+            future.set_exception(e)
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result, False
+
+    def _finish(self, key):
+        # Forget the call first: later callers start a fresh computation
+        with self._lock:
+            del self._calls[key]
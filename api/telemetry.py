@@ -0,0 +1,143 @@
+import os
+import sys
+import time
+from bisect import bisect_left
+
+# Runtime telemetry exposed in Prometheus text format on /metrics/runtime.
+# Cheap enough to stay on in production: bucket arrays are allocated once per
+# label set and updates are plain list increments (no locks). Under heavy
+# contention an increment can occasionally be lost, which is acceptable for
+# monitoring data.
+
+# Seconds; tuned for a sub-millisecond to few-second request path
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Rows per micro-batch
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        cell = self._values.get(label_values)
+        if cell is None:
+            cell = self._values.setdefault(label_values, [0])
+        cell[0] += amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, [0])[0]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, cell in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, label_values)} {cell[0]}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def _get(self, label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            # [per-bucket counts..., +Inf count], [sum]
+            series = self._series.setdefault(label_values, ([0] * (len(self.buckets) + 1), [0.0]))
+        return series
+
+    def observe(self, value, *label_values):
+        counts, total = self._get(label_values)
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labels + ('le',), label_values + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, label_values)} {total[0]}")
+            lines.append(f"{self.name}_count{_labels(self.labels, label_values)} {cumulative}")
+        return lines
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{str(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+# -----------------------------------------------------------------------------
+# METRICS
+# -----------------------------------------------------------------------------
+REQUESTS = Counter("house_api_requests_total", "HTTP requests by endpoint, status code and serving model",
+                   ("endpoint", "status", "model"))
+REQUEST_SECONDS = Histogram("house_api_request_duration_seconds", "End-to-end request latency by endpoint",
+                            ("endpoint",))
+STAGE_SECONDS = Histogram("house_api_predict_stage_seconds", "Latency of each stage inside /predict",
+                          ("stage",))
+CACHE = Counter("house_api_cache_requests_total", "Cache lookups by cache and result (hit/miss)",
+                ("cache", "result"))
+PREDICT_COALESCED = Counter("house_api_predict_coalesced_total",
+                            "/predict requests answered by an identical in-flight computation")
+PREDICT_BATCH_ROWS = Histogram("house_api_predict_batch_rows", "Rows per micro-batched model call on /predict",
+                               buckets=BATCH_SIZE_BUCKETS)
+
+START_TIME = time.time()
+
+def record_cache(cache, hit):
+    CACHE.inc(cache, "hit" if hit else "miss")
+
+class StageTimer:
+    """Times consecutive stages of one request: call mark(stage) at the end of each stage"""
+    __slots__ = ("_last",)
+
+    def __init__(self):
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        STAGE_SECONDS.observe(now - self._last, stage)
+        self._last = now
+
+def process_rss_bytes():
+    # Current RSS from /proc on Linux, peak RSS from getrusage elsewhere
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return None
+
+def render(extra_gauges=None, extra_counters=None):
+    """Prometheus text exposition of every runtime metric"""
+    lines = []
+    for metric in (REQUESTS, REQUEST_SECONDS, STAGE_SECONDS, CACHE, PREDICT_COALESCED, PREDICT_BATCH_ROWS):
+        lines.extend(metric.render())
+
+    hits = sum(cell[0] for (cache, result), cell in CACHE._values.items() if result == "hit")
+    lookups = sum(cell[0] for cell in CACHE._values.values())
+    gauges = {
+        "house_api_cache_hit_ratio": hits / lookups if lookups else 0.0,
+        "process_resident_memory_bytes": process_rss_bytes(),
+        "process_uptime_seconds": time.time() - START_TIME
+    }
+    gauges.update(extra_gauges or {})
+    for kind, values in (("gauge", gauges), ("counter", extra_counters or {})):
+        for name, value in values.items():
+            if value is not None:
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
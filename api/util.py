@@ -2,6 +2,8 @@ import yaml
 import joblib
 import platform
 import os
+import json
+import hashlib
 from pathlib import Path
 
 # Adjusting paths for the new structure where everything is relative to the app execution directory
@@ -47,4 +49,68 @@ def get_model_path(config):
     
     # If path starts with 'models/', and we are in BASE_DIR (which has 'models/'), join them.
     full_path = os.path.join(BASE_DIR, model_rel_path)
-    return full_path
\ No newline at end of file
+    return full_path
+
+def get_root_dir(config_path=None):
+    # Project root is the parent of the config/ directory
+    # (ROOT locally, /app in Docker)
+    config_path = config_path or get_config_path()
+    return os.path.dirname(os.path.dirname(os.path.abspath(config_path)))
+
+# -----------------------------------------------------------------------------
+# STAGE FINGERPRINTING (content-hash caching for pipeline stages)
+# -----------------------------------------------------------------------------
+def stage_spec(config, stage: str, root_dir: str):
+    # Absolute deps/outs and the resolved params of a stage declared under
+    # `stages` in params.yaml
+    spec = config["stages"][stage]
+    deps = [os.path.join(root_dir, p) for p in spec.get("deps", [])]
+    outs = [os.path.join(root_dir, p) for p in spec.get("outs", [])]
+    params = {name: config[name] for name in spec.get("params", [])}
+    return deps, outs, params
+
+def hash_file(file_path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def stage_fingerprint(deps, params) -> str:
+    # Hash of every dependency's content plus the stage params, so a stage
+    # only reruns when its inputs or its configuration actually changed
+    digest = hashlib.sha256()
+    for dep in sorted(deps):
+        digest.update(os.path.basename(dep).encode())
+        digest.update(hash_file(dep).encode())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+def load_stage_lock(lock_path: str) -> dict:
+    if not os.path.exists(lock_path):
+        return {}
+    with open(lock_path, 'r') as f:
+        return json.load(f)
+
+def stage_is_fresh(lock_path: str, stage: str, fingerprint: str, outs) -> bool:
+    entry = load_stage_lock(lock_path).get(stage)
+    if not entry or entry.get("fingerprint") != fingerprint:
+        return False
+    recorded = entry.get("outs", {})
+    for out in outs:
+        key = os.path.basename(out)
+        if not os.path.exists(out) or recorded.get(key) != hash_file(out):
+            return False
+    return True
+
+def save_stage_lock(lock_path: str, stage: str, fingerprint: str, outs) -> None:
+    lock = load_stage_lock(lock_path)
+    lock[stage] = {
+        "fingerprint": fingerprint,
+        "outs": {os.path.basename(out): hash_file(out) for out in outs}
+    }
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    tmp_path = lock_path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(lock, f, indent=4, sort_keys=True)
+    os.replace(tmp_path, lock_path)
@@ -1,6 +1,8 @@
 import streamlit as st
 import requests
 import os
+import io
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import plotly.graph_objects as go
 import plotly.express as px
@@ -41,49 +43,285 @@ def logout():
     st.rerun()
 
 # -----------------------------------------------------------------------------
-# API HELPERS
+# API CLIENT
 # -----------------------------------------------------------------------------
+# (connect, read) timeouts in seconds; drift runs Evidently on the API side
+TIMEOUT_PREDICT = (2, 10)
+TIMEOUT_BATCH = (2, 60)
+TIMEOUT_READ = (2, 5)
+TIMEOUT_DRIFT = (2, 15)
+
+# Cache TTLs in seconds: metrics.json only changes after a retrain,
+# logs and drift change with every prediction
+METRICS_TTL = 600
+LIVE_TTL = 10
+
+@st.cache_resource
+def get_session():
+    # One keep-alive connection pool shared by every Streamlit session
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def fetch_data(path, timeout, params=None, headers=None):
+    """GET an API endpoint, returns (response, data) with data None unless status is success"""
+    response = get_session().get(f"{API_URL}{path}", params=params, headers=headers, timeout=timeout)
+    if response.status_code == 200:
+        data = response.json()
+        if data.get("status") == "success":
+            return response, data.get("data")
+    return response, None
+
+def get_data_or_none(path, timeout, params=None):
+    try:
+        return fetch_data(path, timeout, params)[1]
+    except:
+        return None
+
 def get_prediction(data):
     try:
-        response = requests.post(f"{API_URL}/predict", json=data)
+        response = get_session().post(f"{API_URL}/predict", json=data, timeout=TIMEOUT_PREDICT)
         if response.status_code == 200:
             return response.json()
         return {"status": "error", "message": f"Status {response.status_code}"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-def get_metrics():
+def get_batch_prediction(rows):
+    """Score a list of {LB, LT, KT, KM, GRS} dicts with one /predict/batch call"""
     try:
-        response = requests.get(f"{API_URL}/metrics", timeout=2)
+        response = get_session().post(f"{API_URL}/predict/batch", json={"instances": rows}, timeout=TIMEOUT_BATCH)
+        data = response.json()
         if response.status_code == 200:
-             data = response.json()
-             if data.get("status") == "success":
-                 return data.get("data")
-        return None
-    except:
-        return None
+            return data
+        return {"status": "error", "message": data.get("message", f"Status {response.status_code}")}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@st.cache_data(ttl=METRICS_TTL, show_spinner=False)
+def get_metrics():
+    return get_data_or_none("/metrics", TIMEOUT_READ)
 
+@st.cache_data(ttl=LIVE_TTL, show_spinner=False)
 def get_logs(limit=50):
-    try:
-        response = requests.get(f"{API_URL}/logs", params={"limit": limit}, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("status") == "success":
-                return data.get("data")
-        return None
-    except:
-        return None
+    return get_data_or_none("/logs", TIMEOUT_READ, {"limit": limit})
 
+@st.cache_data(ttl=LIVE_TTL, show_spinner=False)
 def get_drift():
+    return get_data_or_none("/drift", TIMEOUT_DRIFT)
+
+@st.cache_resource
+def dashboard_etag_cache():
+    # Last dashboard response and its ETag, for conditional requests
+    return {}
+
+@st.cache_data(ttl=LIVE_TTL, show_spinner=False)
+def get_dashboard(limit=50):
+    """Metrics, logs and drift for the admin page in one round trip.
+    Unchanged data is answered with 304 (ETag); APIs without /admin/dashboard
+    are queried on the three separate endpoints in parallel."""
+    cached = dashboard_etag_cache().get(limit)
+    headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else {}
     try:
-        response = requests.get(f"{API_URL}/drift", timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("status") == "success":
-                return data.get("data")
-        return None
+        response, data = fetch_data("/admin/dashboard", TIMEOUT_DRIFT, {"limit": limit}, headers)
+        if response.status_code == 304 and cached:
+            return cached["data"]
+        if data is not None:
+            dashboard_etag_cache()[limit] = {"etag": response.headers.get("ETag"), "data": data}
+            return data
     except:
-        return None
+        pass
+
+    # Through the cached getters, so metrics keep their longer METRICS_TTL
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        metrics = pool.submit(get_metrics)
+        logs = pool.submit(get_logs, limit)
+        drift = pool.submit(get_drift)
+        return {"metrics": metrics.result(), "logs": logs.result(), "drift": drift.result()}
+
+def clear_api_cache():
+    # Manual refresh: drop every cached response so the next calls hit the API
+    for cached_call in (get_metrics, get_logs, get_drift, get_dashboard):
+        cached_call.clear()
+    dashboard_etag_cache().clear()
+
+# -----------------------------------------------------------------------------
+# DRIFT CHARTS
+# -----------------------------------------------------------------------------
+SEVERITY_COLORS = {"low": "#198754", "medium": "#fd7e14", "high": "#dc3545"}
+
+def drift_chart_data(features_drift):
+    """Chart arrays computed locally, for APIs whose /drift has no 'chart' field"""
+    codes = list(features_drift)
+    reference = [features_drift[f].get("reference_mean", 0) for f in codes]
+    # Support both 'current_mean' (Evidently) and 'recent_mean' (fallback)
+    current = [features_drift[f].get("current_mean", features_drift[f].get("recent_mean", 0)) for f in codes]
+    peaks = [max(r, c) if max(r, c) > 0 else 1 for r, c in zip(reference, current)]
+    severity = [features_drift[f].get("severity", "low") for f in codes]
+    return {
+        "features": codes,
+        "labels": [features_drift[f].get("feature_name", f) for f in codes],
+        "reference_mean": reference,
+        "current_mean": current,
+        "change_pct": [((c - r) / r) * 100 if r > 0 else 0 for r, c in zip(reference, current)],
+        "radar_reference": [(r / m) * 100 for r, m in zip(reference, peaks)],
+        "radar_current": [(c / m) * 100 for c, m in zip(current, peaks)],
+        "severity": severity,
+        "colors": [SEVERITY_COLORS.get(s, SEVERITY_COLORS["high"]) for s in severity]
+    }
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def build_drift_figures(drift_version, _chart):
+    """Bar, radar and change figures; rebuilt only when the drift result version changes"""
+    labels = _chart["labels"]
+    reference = _chart["reference_mean"]
+    current = _chart["current_mean"]
+
+    # Grouped Bar Chart
+    fig_bar = go.Figure()
+    
+    fig_bar.add_trace(go.Bar(
+        name='Data Historis',
+        x=labels,
+        y=reference,
+        marker_color='#6c757d',
+        text=[f'{v:.0f}' for v in reference],
+        textposition='outside'
+    ))
+    
+    fig_bar.add_trace(go.Bar(
+        name='Data Saat Ini',
+        x=labels,
+        y=current,
+        marker_color='#0d6efd',
+        text=[f'{v:.0f}' for v in current],
+        textposition='outside'
+    ))
+    
+    fig_bar.update_layout(
+        barmode='group',
+        title=dict(
+            text='Perbandingan Rata-rata Nilai per Karakteristik',
+            font=dict(size=16, color='#212529'),
+            x=0
+        ),
+        xaxis_title='Karakteristik Rumah',
+        yaxis_title='Nilai Rata-rata',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(family="Segoe UI, sans-serif", size=12, color="#495057"),
+        height=400,
+        margin=dict(t=80, b=60)
+    )
+    
+    fig_bar.update_xaxes(showgrid=False, showline=True, linecolor='#dee2e6')
+    fig_bar.update_yaxes(showgrid=True, gridcolor='#f8f9fa', showline=True, linecolor='#dee2e6')
+
+    # Radar chart, values normalized per feature to a 0-100 scale by the API
+    radar_reference = _chart["radar_reference"]
+    radar_current = _chart["radar_current"]
+    fig_radar = go.Figure()
+    
+    fig_radar.add_trace(go.Scatterpolar(
+        r=radar_reference + radar_reference[:1],
+        theta=labels + labels[:1],
+        fill='toself',
+        fillcolor='rgba(108, 117, 125, 0.2)',
+        line=dict(color='#6c757d', width=2),
+        name='Data Historis'
+    ))
+    
+    fig_radar.add_trace(go.Scatterpolar(
+        r=radar_current + radar_current[:1],
+        theta=labels + labels[:1],
+        fill='toself',
+        fillcolor='rgba(13, 110, 253, 0.2)',
+        line=dict(color='#0d6efd', width=2),
+        name='Data Saat Ini'
+    ))
+    
+    fig_radar.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 100],
+                showticklabels=False,
+                gridcolor='#e9ecef'
+            ),
+            angularaxis=dict(
+                gridcolor='#e9ecef'
+            ),
+            bgcolor='white'
+        ),
+        title=dict(
+            text='Pola Karakteristik Rumah',
+            font=dict(size=16, color='#212529'),
+            x=0
+        ),
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.15,
+            xanchor="center",
+            x=0.5
+        ),
+        paper_bgcolor='white',
+        font=dict(family="Segoe UI, sans-serif", size=12, color="#495057"),
+        height=450,
+        margin=dict(t=80, b=80)
+    )
+
+    # Horizontal Bar Chart for Change Percentage, smallest change at the bottom
+    order = sorted(range(len(labels)), key=lambda i: _chart["change_pct"][i])
+    changes = [_chart["change_pct"][i] for i in order]
+    fig_change = go.Figure()
+    
+    fig_change.add_trace(go.Bar(
+        y=[labels[i] for i in order],
+        x=changes,
+        orientation='h',
+        marker=dict(
+            color=[_chart["colors"][i] for i in order],
+            line=dict(color='white', width=1)
+        ),
+        text=[f'{v:+.1f}%' for v in changes],
+        textposition='outside',
+        textfont=dict(size=12, color='#495057')
+    ))
+    
+    # Add reference line at 0
+    fig_change.add_vline(x=0, line_width=2, line_color="#dee2e6")
+    
+    fig_change.update_layout(
+        title=dict(
+            text='Tingkat Perubahan dari Data Historis',
+            font=dict(size=16, color='#212529'),
+            x=0
+        ),
+        xaxis_title='Perubahan (%)',
+        yaxis_title='',
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(family="Segoe UI, sans-serif", size=12, color="#495057"),
+        height=350,
+        margin=dict(l=20, r=80, t=60, b=40),
+        showlegend=False
+    )
+    
+    fig_change.update_xaxes(showgrid=True, gridcolor='#f8f9fa', showline=True, linecolor='#dee2e6', zeroline=True, zerolinecolor='#adb5bd')
+    fig_change.update_yaxes(showgrid=False, showline=False)
+
+    return fig_bar, fig_radar, fig_change
 
 # -----------------------------------------------------------------------------
 # PAGES
@@ -164,6 +402,101 @@ def show_user_page():
         else:
              st.info("👈 Isi formulir di kiri untuk melihat estimasi.")
 
+    show_bulk_upload()
+
+FEATURE_COLUMNS = ["LB", "LT", "KT", "KM", "GRS"]
+BULK_CHUNK_SIZE = 200
+
+def read_upload(uploaded):
+    if uploaded.name.lower().endswith(".xlsx"):
+        df = pd.read_excel(uploaded)
+    else:
+        df = pd.read_csv(uploaded)
+    # Feature columns are matched case-insensitively, other columns are kept as they are
+    return df.rename(columns={c: str(c).strip().upper() for c in df.columns if str(c).strip().upper() in FEATURE_COLUMNS})
+
+def to_download(df, as_excel):
+    buffer = io.BytesIO()
+    if as_excel:
+        df.to_excel(buffer, index=False)
+    else:
+        df.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+def score_upload(df, progress, preview):
+    """Send the rows to /predict/batch in chunks, updating the progress bar and preview as results arrive"""
+    result = df.copy()
+    result["PREDIKSI_HARGA"] = None
+    result["STATUS"] = None
+
+    # Rows with empty or non-numeric features are not sent
+    features = result[FEATURE_COLUMNS].apply(pd.to_numeric, errors="coerce")
+    valid = features.notna().all(axis=1)
+    result.loc[~valid, "STATUS"] = "Data tidak lengkap"
+    valid_index = result.index[valid]
+
+    for start in range(0, len(valid_index), BULK_CHUNK_SIZE):
+        chunk_index = valid_index[start:start + BULK_CHUNK_SIZE]
+        rows = features.loc[chunk_index].astype(int).to_dict(orient="records")
+        response = get_batch_prediction(rows)
+        if response.get("status") == "success":
+            result.loc[chunk_index, "PREDIKSI_HARGA"] = response["predictions"]
+            result.loc[chunk_index, "STATUS"] = "OK"
+        else:
+            result.loc[chunk_index, "STATUS"] = f"Gagal: {response.get('message')}"
+
+        done = min(start + BULK_CHUNK_SIZE, len(valid_index))
+        progress.progress(done / len(valid_index), text=f"Memproses {done}/{len(valid_index)} rumah...")
+        preview.dataframe(result.loc[valid_index[:done]], use_container_width=True, hide_index=True)
+
+    return result
+
+def show_bulk_upload():
+    st.markdown("---")
+    st.markdown("### 📂 Prediksi Massal (Upload File)")
+    st.markdown(f"*Unggah file CSV/Excel dengan kolom {', '.join(FEATURE_COLUMNS)} untuk menghitung estimasi banyak rumah sekaligus.*")
+
+    uploaded = st.file_uploader("Pilih file", type=["csv", "xlsx"])
+    if uploaded is None:
+        return
+
+    try:
+        df = read_upload(uploaded)
+    except Exception as e:
+        st.error(f"File tidak dapat dibaca: {e}")
+        return
+
+    missing = [c for c in FEATURE_COLUMNS if c not in df.columns]
+    if missing:
+        st.error(f"Kolom tidak ditemukan: {', '.join(missing)}")
+        return
+    st.caption(f"{len(df):,} baris ditemukan.")
+
+    if st.button("🚀 Proses File", use_container_width=True):
+        progress = st.progress(0.0, text="Mengirim data ke API...")
+        preview = st.empty()
+        result = score_upload(df, progress, preview)
+        progress.empty()
+        preview.empty()
+        st.session_state.bulk_result = {"name": uploaded.name, "data": result}
+
+    # Kept in session state so the download button rerun does not lose the results
+    bulk = st.session_state.get("bulk_result")
+    if bulk and bulk["name"] == uploaded.name:
+        result = bulk["data"]
+        scored = int((result["STATUS"] == "OK").sum())
+        st.success(f"✅ {scored:,} dari {len(result):,} rumah berhasil diprediksi.")
+        st.dataframe(result, use_container_width=True, hide_index=True)
+
+        as_excel = uploaded.name.lower().endswith(".xlsx")
+        base_name = os.path.splitext(uploaded.name)[0]
+        st.download_button(
+            "⬇️ Unduh Hasil",
+            data=to_download(result, as_excel),
+            file_name=f"{base_name}_prediksi.{'xlsx' if as_excel else 'csv'}",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" if as_excel else "text/csv"
+        )
+
 def show_admin_page():
     st.markdown('<div class="main-header">📊 Admin Dashboard</div>', unsafe_allow_html=True)
     st.markdown('<div class="sub-header">Monitoring Performa Model Regresi.</div>', unsafe_allow_html=True)
@@ -171,56 +504,57 @@ def show_admin_page():
     with st.sidebar:
         st.image("https://cdn-icons-png.flaticon.com/512/97/97895.png", width=50)
         st.write(f"Logged in as: **Admin**")
+        if st.button("🔄 Refresh Data", help="Ambil data terbaru dari API (lewati cache)"):
+            clear_api_cache()
         if st.button("Logout", type="secondary"):
             logout()
             
-    metrics = get_metrics()
+    dashboard = get_dashboard(limit=50)
+    metrics = dashboard.get("metrics")
     
     if metrics:
         # Determine format (new vs old)
         if "model1" in metrics:
-            m1 = metrics["model1"]
-            m2 = metrics.get("model2", {"name": "Backup Model", "r2": 0, "mape": 0})
+            model_slots = sorted(
+                (k for k, v in metrics.items() if k.startswith("model") and isinstance(v, dict)),
+                key=lambda k: int(k[len("model"):])
+            )
+            model_list = [(slot, metrics[slot]) for slot in model_slots]
             last_updated = metrics.get("last_updated", "-")
             
-            # Determine active based on logic (hardcoded logic replication for display)
-            active_name = m1["name"]
-            if m2["r2"] > m1["r2"]:
-                active_name = m2["name"]
+            # Active model is chosen by the API (score + latency/size budget);
+            # older APIs don't report it, so fall back to the highest R2
+            active_slot = metrics.get("active_model") or max(model_slots, key=lambda s: metrics[s].get("r2", 0))
                 
         else:
             # Old format fallback
-            m1 = {"name": "Linear Regression", "r2": metrics.get("r2", 0), "mape": metrics.get("mape", 0)}
-            m2 = {"name": "Random Forest", "r2": 0, "mape": 0}
+            model_list = [("model1", {"name": "Linear Regression", "r2": metrics.get("r2", 0), "mape": metrics.get("mape", 0)})]
             last_updated = metrics.get("last_updated", "-")
-            active_name = "Linear Regression"
+            active_slot = "model1"
 
+        active_name = dict(model_list).get(active_slot, {}).get("name", active_slot)
         st.info(f"⚡ **Active Model System**: {active_name}")
 
-        col1, col2 = st.columns(2)
+        icons = ["🔹", "🔸", "🔺"]
+        model_cols = st.columns(len(model_list))
         
-        with col1:
-            st.markdown(f"### 🔹 Model 1: {m1.get('name', 'Linear Regression')}")
-            c1, c2 = st.columns(2)
-            c1.metric("R2 Score", f"{m1['r2']:.4f}")
-            c2.metric("MAPE", f"{m1['mape']:.2%}", delta_color="inverse")
-            if m2['r2'] > m1['r2']:
-                st.caption("⚠️ Disabling (Lower Accuracy)")
-            else:
-                st.success("✅ Active Model")
-                
-        with col2:
-            st.markdown(f"### 🔸 Model 2: {m2.get('name', 'Random Forest')}")
-            c3, c4 = st.columns(2)
-            c3.metric("R2 Score", f"{m2['r2']:.4f}")
-            c4.metric("MAPE", f"{m2['mape']:.2%}", delta_color="inverse")
-            if m2['r2'] > m1['r2']:
-                st.success("✅ Active Model")
-            else:
-                 st.caption("Cadangan (Backup)")
+        for idx, (slot, m) in enumerate(model_list):
+            with model_cols[idx]:
+                st.markdown(f"### {icons[idx % len(icons)]} Model {idx + 1}: {m.get('name', slot)}")
+                c1, c2 = st.columns(2)
+                c1.metric("R2 Score", f"{m.get('r2', 0):.4f}")
+                c2.metric("MAPE", f"{m.get('mape', 0):.2%}", delta_color="inverse")
+                if "latency_ms" in m:
+                    st.caption(f"⏱️ {m['latency_ms']:.2f} ms/prediksi • 💾 {m.get('size_bytes', 0) / 1024:,.0f} KB")
+                if slot == active_slot:
+                    st.success("✅ Active Model")
+                else:
+                    st.caption("Cadangan (Backup)")
 
         st.markdown("---")
         st.markdown(f"### 🕒 Last Updated: {last_updated}")
+        if metrics.get("model_version"):
+            st.caption(f"Versi model: `{metrics['model_version']}`")
         
         # -------------------------------------------------------------------------
         # MONITORING LOG SECTION
@@ -228,7 +562,7 @@ def show_admin_page():
         st.markdown("---")
         st.markdown("### 📋 Monitoring Log Prediksi")
         
-        logs_data = get_logs(limit=50)
+        logs_data = dashboard.get("logs")
         
         if logs_data:
             summary = logs_data.get("summary", {})
@@ -258,6 +592,7 @@ def show_admin_page():
                     # Shorten names for table
                     if "Linear" in model_used: model_used = "Linear Reg."
                     if "Forest" in model_used: model_used = "Random Forest"
+                    if "Boosting" in model_used: model_used = "Gradient Boosting"
                     
                     log_display.append({
                         "Waktu": log.get("timestamp", "-"),
@@ -283,7 +618,7 @@ def show_admin_page():
         st.markdown("### Pemantauan Kualitas Data")
         st.markdown("*Memastikan data yang masuk sesuai dengan pola yang dipelajari sistem*")
         
-        drift_data = get_drift()
+        drift_data = dashboard.get("drift")
         
         if drift_data:
             overall_status = drift_data.get("overall_status", "unknown")
@@ -430,207 +765,24 @@ def show_admin_page():
                     st.markdown("#### Visualisasi Perbandingan Data")
                     st.markdown("*Grafik perbandingan antara data historis dengan data saat ini*")
                     
-                    # Prepare data for charts
-                    chart_features = []
-                    chart_historical = []
-                    chart_current = []
-                    chart_changes = []
-                    chart_colors = []
-                    chart_p_values = []
-                    chart_drift_detected = []
-                    
-                    for feature, data in features_drift.items():
-                        info = feature_info.get(feature, {"name": feature, "unit": ""})
-                        ref_val = data.get("reference_mean", 0)
-                        # Support both 'current_mean' (Evidently) and 'recent_mean' (fallback)
-                        cur_val = data.get("current_mean", data.get("recent_mean", 0))
-                        severity = data.get("severity", "low")
-                        p_value = data.get("p_value", None)
-                        is_drifted = data.get("drift_detected", False)
-                        
-                        chart_features.append(info["name"])
-                        chart_historical.append(ref_val)
-                        chart_current.append(cur_val)
-                        chart_p_values.append(p_value)
-                        chart_drift_detected.append(is_drifted)
-                        
-                        if ref_val > 0:
-                            change = ((cur_val - ref_val) / ref_val) * 100
-                        else:
-                            change = 0
-                        chart_changes.append(change)
-                        
-                        # Color based on severity
-                        if severity == "low":
-                            chart_colors.append("#198754")
-                        elif severity == "medium":
-                            chart_colors.append("#fd7e14")
-                        else:
-                            chart_colors.append("#dc3545")
+                    # Chart arrays come ready from the API (older APIs: computed here)
+                    chart = drift_data.get("chart") or drift_chart_data(features_drift)
+                    fig_bar, fig_radar, fig_change = build_drift_figures(drift_data.get("version") or str(chart), chart)
                     
                     # Tab untuk berbagai grafik
                     tab_bar, tab_radar, tab_change, tab_stats = st.tabs(["Perbandingan Nilai", "Pola Karakteristik", "Tingkat Perubahan", "Detail Statistik"])
                     
                     with tab_bar:
-                        # Grouped Bar Chart
-                        fig_bar = go.Figure()
-                        
-                        fig_bar.add_trace(go.Bar(
-                            name='Data Historis',
-                            x=chart_features,
-                            y=chart_historical,
-                            marker_color='#6c757d',
-                            text=[f'{v:.0f}' for v in chart_historical],
-                            textposition='outside'
-                        ))
-                        
-                        fig_bar.add_trace(go.Bar(
-                            name='Data Saat Ini',
-                            x=chart_features,
-                            y=chart_current,
-                            marker_color='#0d6efd',
-                            text=[f'{v:.0f}' for v in chart_current],
-                            textposition='outside'
-                        ))
-                        
-                        fig_bar.update_layout(
-                            barmode='group',
-                            title=dict(
-                                text='Perbandingan Rata-rata Nilai per Karakteristik',
-                                font=dict(size=16, color='#212529'),
-                                x=0
-                            ),
-                            xaxis_title='Karakteristik Rumah',
-                            yaxis_title='Nilai Rata-rata',
-                            legend=dict(
-                                orientation="h",
-                                yanchor="bottom",
-                                y=1.02,
-                                xanchor="right",
-                                x=1
-                            ),
-                            plot_bgcolor='white',
-                            paper_bgcolor='white',
-                            font=dict(family="Segoe UI, sans-serif", size=12, color="#495057"),
-                            height=400,
-                            margin=dict(t=80, b=60)
-                        )
-                        
-                        fig_bar.update_xaxes(showgrid=False, showline=True, linecolor='#dee2e6')
-                        fig_bar.update_yaxes(showgrid=True, gridcolor='#f8f9fa', showline=True, linecolor='#dee2e6')
-                        
                         st.plotly_chart(fig_bar, use_container_width=True)
                         
                         st.caption("Grafik ini menunjukkan perbandingan nilai rata-rata antara data yang dipelajari sistem (historis) dengan data yang masuk saat ini. Semakin mirip kedua batang, semakin konsisten datanya.")
                     
                     with tab_radar:
-                        # Normalize data for radar chart (0-100 scale)
-                        max_vals = [max(h, c) if max(h, c) > 0 else 1 for h, c in zip(chart_historical, chart_current)]
-                        normalized_historical = [(h / m) * 100 for h, m in zip(chart_historical, max_vals)]
-                        normalized_current = [(c / m) * 100 for c, m in zip(chart_current, max_vals)]
-                        
-                        fig_radar = go.Figure()
-                        
-                        fig_radar.add_trace(go.Scatterpolar(
-                            r=normalized_historical + [normalized_historical[0]],
-                            theta=chart_features + [chart_features[0]],
-                            fill='toself',
-                            fillcolor='rgba(108, 117, 125, 0.2)',
-                            line=dict(color='#6c757d', width=2),
-                            name='Data Historis'
-                        ))
-                        
-                        fig_radar.add_trace(go.Scatterpolar(
-                            r=normalized_current + [normalized_current[0]],
-                            theta=chart_features + [chart_features[0]],
-                            fill='toself',
-                            fillcolor='rgba(13, 110, 253, 0.2)',
-                            line=dict(color='#0d6efd', width=2),
-                            name='Data Saat Ini'
-                        ))
-                        
-                        fig_radar.update_layout(
-                            polar=dict(
-                                radialaxis=dict(
-                                    visible=True,
-                                    range=[0, 100],
-                                    showticklabels=False,
-                                    gridcolor='#e9ecef'
-                                ),
-                                angularaxis=dict(
-                                    gridcolor='#e9ecef'
-                                ),
-                                bgcolor='white'
-                            ),
-                            title=dict(
-                                text='Pola Karakteristik Rumah',
-                                font=dict(size=16, color='#212529'),
-                                x=0
-                            ),
-                            showlegend=True,
-                            legend=dict(
-                                orientation="h",
-                                yanchor="bottom",
-                                y=-0.15,
-                                xanchor="center",
-                                x=0.5
-                            ),
-                            paper_bgcolor='white',
-                            font=dict(family="Segoe UI, sans-serif", size=12, color="#495057"),
-                            height=450,
-                            margin=dict(t=80, b=80)
-                        )
-                        
                         st.plotly_chart(fig_radar, use_container_width=True)
                         
                         st.caption("Grafik radar menunjukkan pola keseluruhan karakteristik rumah. Area biru (saat ini) yang mendekati area abu-abu (historis) menandakan data yang konsisten.")
                     
                     with tab_change:
-                        # Horizontal Bar Chart for Change Percentage
-                        df_change = pd.DataFrame({
-                            'Karakteristik': chart_features,
-                            'Perubahan (%)': chart_changes,
-                            'Warna': chart_colors
-                        })
-                        df_change = df_change.sort_values('Perubahan (%)', ascending=True)
-                        
-                        fig_change = go.Figure()
-                        
-                        fig_change.add_trace(go.Bar(
-                            y=df_change['Karakteristik'],
-                            x=df_change['Perubahan (%)'],
-                            orientation='h',
-                            marker=dict(
-                                color=df_change['Warna'],
-                                line=dict(color='white', width=1)
-                            ),
-                            text=[f'{v:+.1f}%' for v in df_change['Perubahan (%)']],
-                            textposition='outside',
-                            textfont=dict(size=12, color='#495057')
-                        ))
-                        
-                        # Add reference line at 0
-                        fig_change.add_vline(x=0, line_width=2, line_color="#dee2e6")
-                        
-                        fig_change.update_layout(
-                            title=dict(
-                                text='Tingkat Perubahan dari Data Historis',
-                                font=dict(size=16, color='#212529'),
-                                x=0
-                            ),
-                            xaxis_title='Perubahan (%)',
-                            yaxis_title='',
-                            plot_bgcolor='white',
-                            paper_bgcolor='white',
-                            font=dict(family="Segoe UI, sans-serif", size=12, color="#495057"),
-                            height=350,
-                            margin=dict(l=20, r=80, t=60, b=40),
-                            showlegend=False
-                        )
-                        
-                        fig_change.update_xaxes(showgrid=True, gridcolor='#f8f9fa', showline=True, linecolor='#dee2e6', zeroline=True, zerolinecolor='#adb5bd')
-                        fig_change.update_yaxes(showgrid=False, showline=False)
-                        
                         st.plotly_chart(fig_change, use_container_width=True)
                         
                         # Color legend
@@ -706,20 +858,15 @@ def show_admin_page():
                     
                     # Buat 2 kolom
                     col1, col2 = st.columns(2)
-                    items = list(features_drift.items())
                     
-                    for idx, (feature, data) in enumerate(items):
+                    for idx, feature in enumerate(chart["features"]):
+                        data = features_drift[feature]
                         info = feature_info.get(feature, {"name": feature, "unit": "", "desc": ""})
-                        severity = data.get("severity", "low")
-                        ref_val = data.get("reference_mean", 0)
-                        cur_val = data.get("current_mean", data.get("recent_mean", 0))
+                        severity = chart["severity"][idx]
+                        ref_val = chart["reference_mean"][idx]
+                        cur_val = chart["current_mean"][idx]
                         drift_detected = data.get("drift_detected", False)
-                        
-                        # Hitung persentase perubahan
-                        if ref_val > 0:
-                            change_pct = ((cur_val - ref_val) / ref_val) * 100
-                        else:
-                            change_pct = 0
+                        change_pct = chart["change_pct"][idx]
                         
                         # Warna berdasarkan severity
                         if severity == "low":
@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+import timeit
+import argparse
+import datetime
+import statistics
+
+# Paths
+ROOT_DIR = os.getcwd()
+API_DIR = os.path.join(ROOT_DIR, "api")
+BASELINE_PATH = os.path.join(ROOT_DIR, "benchmarks", "predict_baseline.json")
+# Trained models kept for the benchmark only, so the baseline does not depend
+# on (or change) what the API serves
+FIXTURE_MODEL_DIR = os.path.join("benchmarks", "fixtures", "models")
+
+SAMPLE_PAYLOAD = {"LB": 100, "LT": 120, "KT": 3, "KM": 2, "GRS": 1}
+
+def load_api():
+    sys.path.insert(0, API_DIR)
+    import app as api_app
+    return api_app
+
+def wait_until_ready(api_app, timeout=120):
+    # Importing app starts the warm-up thread; timings taken while it runs are noise
+    deadline = time.monotonic() + timeout
+    while api_app.serving.get("warmup") is None:
+        if time.monotonic() > deadline:
+            raise SystemExit(f"API did not finish warming up within {timeout}s")
+        time.sleep(0.1)
+    if not api_app.is_ready(api_app.serving):
+        raise SystemExit(f"API is not ready (warm-up: {api_app.serving['warmup']})")
+
+def build_stages(api_app, models, active_slot):
+    """One callable per cost inside predict(), in request order"""
+    import pandas as pd
+    from flask import jsonify
+
+    predictors = api_app.config["prediktor"]
+    body = json.dumps(SAMPLE_PAYLOAD).encode()
+    data_json = json.loads(body)
+
+    def make_frame():
+        df = pd.DataFrame({p: [data_json[p]] for p in predictors})
+        for p in predictors:
+            df[p] = df[p].astype('int64')
+        return df
+
+    df = make_frame()
+    response = {
+        "status": "success",
+        "prediction": 1.0,
+        "model_used": "Model 1 (Linear Regression)",
+        "model_version": api_app.serving["model_version"],
+        "details": dict(
+            {slot: {"prediction": 1.0 if slot == active_slot else None, "r2": 0.5} for slot in set(models) | {"model1", "model2"}},
+            switched=active_slot != "model1", all_models=False
+        )
+    }
+
+    def serialize():
+        with api_app.app.app_context():
+            return jsonify(response)
+
+    stages = {
+        "json_parse": lambda: json.loads(body),
+        "dataframe": make_frame,
+        "cek_data": lambda: api_app.data_preparation.cek_data(df, api_app.config, True),
+    }
+    for slot, model in models.items():
+        stages[f"predict_{slot}"] = lambda model=model: model.predict(df)
+    stages["log_prediction"] = lambda: api_app.log_prediction(data_json, 1.0, "success", model_used="bench", details=None)
+    stages["jsonify"] = serialize
+    return stages
+
+def measure(stages, number, repeat):
+    """{stage: median over repeats of the mean per-call time, in microseconds}.
+    Stages take turns within each repeat, so a slow spell of the machine
+    hits every stage in one repeat instead of all repeats of one stage."""
+    timers = {name: timeit.Timer(fn) for name, fn in stages.items()}
+    for fn in stages.values():
+        fn()
+    runs = {name: [] for name in stages}
+    for _ in range(repeat):
+        for name, timer in timers.items():
+            runs[name].append(timer.timeit(number=number))
+    return {name: statistics.median(times) / number * 1e6 for name, times in runs.items()}
+
+def compare(results, baseline, threshold, min_delta_us):
+    """(regressed stages, stages only in the run or only in the baseline)"""
+    regressions = []
+    print(f"{'Stage':<20}{'Current us':>12}{'Baseline us':>13}{'Change':>9}")
+    for stage, current in results.items():
+        base = baseline.get(stage)
+        if base is None:
+            print(f"{stage:<20}{current:>12.1f}{'-':>13}{'new':>9}  NOT IN BASELINE")
+            continue
+        change = (current - base) / base if base else 0
+        regressed = change > threshold and current - base > min_delta_us
+        mark = "  REGRESSION" if regressed else ""
+        print(f"{stage:<20}{current:>12.1f}{base:>13.1f}{change:>+9.1%}{mark}")
+        if regressed:
+            regressions.append(stage)
+    for stage in baseline:
+        if stage not in results:
+            print(f"{stage:<20}{'-':>12}{baseline[stage]:>13.1f}{'gone':>9}  NOT MEASURED")
+    # Stages without a counterpart (e.g. a model the baseline never saw) were not compared; never pass silently
+    mismatched = sorted(set(results) ^ set(baseline))
+    return regressions, mismatched
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmark each stage of the /predict code path")
+    parser.add_argument("--number", type=int, default=200, help="calls per timing run")
+    parser.add_argument("--repeat", type=int, default=15, help="timing runs per stage (median is kept)")
+    parser.add_argument("--threshold", type=float, default=0.5, help="allowed slowdown vs baseline (0.5 = 50%%)")
+    parser.add_argument("--min-delta-us", type=float, default=25.0, help="ignore slowdowns smaller than this")
+    parser.add_argument("--model-dir", default=FIXTURE_MODEL_DIR,
+                        help="directory with model_<n>.pkl and metrics.json to benchmark (default: the fixture models)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="store the current numbers as the new baseline")
+    args = parser.parse_args()
+
+    api_app = load_api()
+    wait_until_ready(api_app)
+    models, model_metadata = api_app.model_loader.load_models(os.path.join(ROOT_DIR, args.model_dir))
+    active_slot = api_app.model_loader.select_active_model(models, model_metadata, api_app.config.get("model_selection", {}))
+    stages = build_stages(api_app, models, active_slot)
+    print(f"Benchmarking {len(stages)} stages (models: {args.model_dir})...")
+    results = measure(stages, args.number, args.repeat)
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "model_dir": args.model_dir,
+                "stages_us": {k: round(v, 2) for k, v in results.items()}
+            }, f, indent=4)
+        for name, value in results.items():
+            print(f"{name:<20}{value:>12.1f} us")
+        print(f"Baseline saved to {args.baseline}")
+        sys.exit(0)
+
+    with open(args.baseline, "r") as f:
+        baseline_data = json.load(f)
+    if baseline_data.get("model_dir") != args.model_dir:
+        print(f"WARNING: baseline was recorded with the models in {baseline_data.get('model_dir')}, "
+              f"this run uses {args.model_dir}; predict timings may not be comparable")
+    regressions, mismatched = compare(results, baseline_data["stages_us"], args.threshold, args.min_delta_us)
+    failed = False
+    if mismatched:
+        print(f"\nFAILED: stages do not match the baseline: {', '.join(mismatched)} (re-record it with --update-baseline)")
+        failed = True
+    if regressions:
+        print(f"\nFAILED: {len(regressions)} stage(s) regressed more than {args.threshold:.0%}: {', '.join(regressions)}")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("\nOK: no stage regressed past the threshold")
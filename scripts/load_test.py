@@ -0,0 +1,199 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import subprocess
+import datetime
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+import yaml
+import joblib
+
+# Paths
+ROOT_DIR = os.getcwd()
+API_DIR = os.path.join(ROOT_DIR, "api")
+CONFIG_PATH = os.path.join(ROOT_DIR, "config", "params.yaml")
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks")
+
+ENDPOINTS = ["predict", "batch", "logs", "drift"]
+
+# -----------------------------------------------------------------------------
+# WORKLOADS
+# -----------------------------------------------------------------------------
+def synthetic_payloads(config, n, seed=42):
+    # Uniform within the valid ranges of params.yaml
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(n):
+        payloads.append({f: rng.randint(*config[f"rentang_{f}"]) for f in config["prediktor"]})
+    return payloads
+
+def sampled_payloads(config, n, seed=42):
+    # Rows resampled from the held-out test set (production-like distribution)
+    x_test = joblib.load(os.path.join(ROOT_DIR, config["test_set_path"][0]))
+    sample = x_test[config["prediktor"]].sample(n=n, replace=True, random_state=seed)
+    return [{k: int(v) for k, v in row.items()} for row in sample.to_dict(orient="records")]
+
+def replay_payloads(path, n):
+    # One JSON payload per line, cycled to n requests
+    with open(path, "r") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    return [lines[i % len(lines)] for i in range(n)]
+
+# -----------------------------------------------------------------------------
+# SERVER
+# -----------------------------------------------------------------------------
+def start_local_server():
+    # Serve api/app.py in-process on a free port with a threaded WSGI server
+    from werkzeug.serving import make_server
+
+    sys.path.insert(0, API_DIR)
+    import app as api_app
+
+    # Per-request access logs would dominate the measurement
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    server = make_server("127.0.0.1", 0, api_app.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+# -----------------------------------------------------------------------------
+# LOAD GENERATOR
+# -----------------------------------------------------------------------------
+_local = threading.local()
+
+def get_session():
+    # One keep-alive session per worker thread
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+def make_request(base_url, endpoint, payload, timeout):
+    session = get_session()
+    start = time.perf_counter()
+    try:
+        if endpoint == "predict":
+            response = session.post(f"{base_url}/predict", json=payload, timeout=timeout)
+        elif endpoint == "batch":
+            response = session.post(f"{base_url}/predict/batch", json={"instances": payload}, timeout=timeout)
+        else:
+            response = session.get(f"{base_url}/{endpoint}", timeout=timeout)
+        ok = response.status_code == 200
+    except requests.RequestException:
+        ok = False
+    return (time.perf_counter() - start) * 1000, ok
+
+def run_phase(base_url, endpoint, payloads, concurrency, timeout):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda p: make_request(base_url, endpoint, p, timeout), payloads))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([r[0] for r in results])
+    errors = sum(1 for r in results if not r[1])
+    return {
+        "requests": len(results),
+        "errors": errors,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "rps": round(len(results) / elapsed, 2),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "max_ms": round(float(latencies.max()), 2)
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def run_load_test(args):
+    with open(CONFIG_PATH, "r") as f:
+        config = yaml.safe_load(f)
+
+    # 1. Workload
+    if args.replay:
+        payloads = replay_payloads(args.replay, args.requests)
+    elif args.workload == "sampled":
+        payloads = sampled_payloads(config, args.requests)
+    else:
+        payloads = synthetic_payloads(config, args.requests)
+    batches = [payloads[i:i + args.batch_size] for i in range(0, len(payloads), args.batch_size)]
+
+    # 2. Target
+    server = None
+    base_url = args.url
+    if not base_url:
+        print("Starting API in-process...")
+        server, base_url = start_local_server()
+    print(f"Target: {base_url}")
+
+    # 3. Phases: warm up, then one phase per endpoint
+    phase_inputs = {
+        "predict": payloads,
+        "batch": batches,
+        "logs": [None] * args.requests,
+        "drift": [None] * max(args.requests // 10, 1)
+    }
+    results = {}
+    try:
+        run_phase(base_url, "predict", payloads[:args.warmup], 1, args.timeout)
+        for endpoint in args.endpoints:
+            results[endpoint] = run_phase(base_url, endpoint, phase_inputs[endpoint], args.concurrency, args.timeout)
+            if endpoint == "batch":
+                results[endpoint]["batch_size"] = args.batch_size
+                results[endpoint]["rows_per_s"] = round(len(payloads) / results[endpoint]["duration_s"], 2)
+    finally:
+        if server:
+            server.shutdown()
+
+    # 4. Report
+    print(f"\n{'Endpoint':<10}{'Reqs':>7}{'Errors':>8}{'RPS':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for endpoint, r in results.items():
+        print(f"{endpoint:<10}{r['requests']:>7}{r['errors']:>8}{r['rps']:>10.1f}"
+              f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}")
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "target": "in-process" if server else base_url,
+        "workload": "replay" if args.replay else args.workload,
+        "results": results
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"load_test_{report['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"\nResults saved to {output}")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the house price API")
+    parser.add_argument("--url", default=None, help="API base URL (default: start api/app.py in-process)")
+    parser.add_argument("--endpoints", type=lambda s: s.split(","), default=ENDPOINTS,
+                        help=f"comma separated subset of {','.join(ENDPOINTS)}")
+    parser.add_argument("--workload", choices=["synthetic", "sampled"], default="sampled",
+                        help="synthetic: uniform in params.yaml ranges, sampled: rows from x_test.pkl")
+    parser.add_argument("--replay", default=None, help="JSONL file of /predict payloads to replay instead")
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=50, help="rows per /predict/batch call")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--output", default=None, help="JSON results path (default: benchmarks/load_test_<commit>.json)")
+    args = parser.parse_args()
+
+    unknown = [e for e in args.endpoints if e not in ENDPOINTS]
+    if unknown:
+        parser.error(f"unknown endpoints {unknown}")
+    run_load_test(args)
@@ -0,0 +1,172 @@
+import os
+import sys
+import time
+import shlex
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Paths
+ROOT_DIR = os.getcwd()
+sys.path.insert(0, os.path.join(ROOT_DIR, "api"))
+import util as utils
+
+CONFIG_PATH = os.path.join(ROOT_DIR, "config", "params.yaml")
+
+# Stage states
+SKIPPED = "skipped"
+RAN = "ran"
+FAILED = "failed"
+BLOCKED = "blocked"
+
+def build_dag(stages):
+    # A stage depends on every other stage that produces one of its deps
+    producers = {}
+    for name, spec in stages.items():
+        for out in spec.get("outs", []):
+            producers[out] = name
+
+    upstream = {}
+    for name, spec in stages.items():
+        upstream[name] = {producers[d] for d in spec.get("deps", []) if d in producers and producers[d] != name}
+    return upstream
+
+def select_stages(upstream, targets):
+    # Targets plus everything they transitively depend on
+    selected = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(upstream[name])
+    return selected
+
+def is_fresh(config, name, lock_path):
+    spec = config["stages"][name]
+    if spec.get("always_run", False):
+        return False, None
+
+    deps, outs, params = utils.stage_spec(config, name, ROOT_DIR)
+    if not all(os.path.exists(d) for d in deps):
+        return False, None
+
+    fingerprint = utils.stage_fingerprint(deps, params)
+    return utils.stage_is_fresh(lock_path, name, fingerprint, outs), fingerprint
+
+def run_stage(name, spec):
+    # Run the stage command as its own process and capture its output so
+    # that parallel stages do not interleave on the console
+    args = shlex.split(spec["cmd"])
+    if args[0] == "python":
+        args[0] = sys.executable
+    cwd = os.path.join(ROOT_DIR, spec.get("wdir", "."))
+
+    start = time.perf_counter()
+    proc = subprocess.run(args, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    elapsed = time.perf_counter() - start
+    return proc.returncode, proc.stdout, elapsed
+
+def run_pipeline(targets=None, force=False, jobs=None, dry_run=False, skip=()):
+    config = utils.load_params(CONFIG_PATH)
+    stages = config["stages"]
+    lock_path = os.path.join(ROOT_DIR, config["pipeline_lock_path"])
+
+    unknown = [t for t in list(targets or []) + list(skip) if t not in stages]
+    if unknown:
+        print(f"Error: unknown stages {unknown}. Available: {list(stages)}")
+        sys.exit(1)
+
+    upstream = build_dag(stages)
+    selected = select_stages(upstream, targets or list(stages))
+    results = {}
+    executed = set()
+
+    with ThreadPoolExecutor(max_workers=jobs or len(selected)) as pool:
+        running = {}
+        while len(results) < len(selected):
+            progressed = False
+            # Schedule every stage whose upstream stages have all finished
+            for name in stages:
+                if name not in selected or name in results or name in running.values():
+                    continue
+                # results hold (status, elapsed); only the status matters here
+                deps_state = [results[u][0] if u in results else None for u in upstream[name] if u in selected]
+                if None in deps_state:
+                    continue
+                progressed = True
+                if name in skip:
+                    results[name] = (SKIPPED, 0.0)
+                    print(f"[{name}] skipped on request")
+                    continue
+                if any(s in (FAILED, BLOCKED) for s in deps_state):
+                    results[name] = (BLOCKED, 0.0)
+                    print(f"[{name}] blocked by failed upstream stage")
+                    continue
+
+                upstream_ran = any(s == RAN for s in deps_state)
+                if dry_run:
+                    fresh = False if upstream_ran else is_fresh(config, name, lock_path)[0]
+                    results[name] = (SKIPPED if fresh and not force else RAN, 0.0)
+                    print(f"[{name}] {'up to date' if fresh and not force else 'would run'}")
+                    continue
+
+                fresh, _ = is_fresh(config, name, lock_path)
+                if fresh and not force:
+                    results[name] = (SKIPPED, 0.0)
+                    print(f"[{name}] up to date, skipping")
+                    continue
+
+                print(f"[{name}] running: {stages[name]['cmd']}")
+                running[pool.submit(run_stage, name, stages[name])] = name
+
+            if not running:
+                if not progressed:
+                    print("Error: stage dependencies form a cycle")
+                    sys.exit(1)
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                returncode, output, elapsed = future.result()
+                for line in output.splitlines():
+                    print(f"[{name}] {line}")
+                if returncode == 0:
+                    results[name] = (RAN, elapsed)
+                    executed.add(name)
+                    print(f"[{name}] done in {elapsed:.2f}s")
+                else:
+                    results[name] = (FAILED, elapsed)
+                    print(f"[{name}] failed with exit code {returncode}")
+
+    # Record fingerprints only once all stage processes have exited, so the
+    # lock file never has two concurrent writers
+    for name in executed:
+        if stages[name].get("always_run", False):
+            continue
+        deps, outs, params = utils.stage_spec(config, name, ROOT_DIR)
+        if all(os.path.exists(p) for p in deps + outs):
+            utils.save_stage_lock(lock_path, name, utils.stage_fingerprint(deps, params), outs)
+
+    # Report
+    print("\nPipeline summary:")
+    print(f"{'Stage':<12}{'Status':<10}{'Wall time':>10}")
+    for name in stages:
+        if name in results:
+            status, elapsed = results[name]
+            print(f"{name:<12}{status:<10}{elapsed:>9.2f}s")
+
+    return all(status in (RAN, SKIPPED) for status, _ in results.values())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the scrape -> prepare -> clean -> train pipeline")
+    parser.add_argument("targets", nargs="*", help="stages to run (default: all), upstream stages are included")
+    parser.add_argument("--force", action="store_true", help="rerun stages even if they are up to date")
+    parser.add_argument("--jobs", type=int, default=None, help="max stages running in parallel")
+    parser.add_argument("--skip", action="append", default=[], help="treat a stage as up to date (e.g. --skip scrape offline)")
+    parser.add_argument("--dry-run", action="store_true", help="only show which stages would run")
+    args = parser.parse_args()
+
+    ok = run_pipeline(args.targets, force=args.force, jobs=args.jobs, dry_run=args.dry_run, skip=args.skip)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,147 @@
+import os
+import sys
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Paths
+ROOT_DIR = os.getcwd()
+sys.path.insert(0, os.path.join(ROOT_DIR, "api"))
+import util as utils
+import registry
+import model_loader
+
+# Offline batch scoring without the API: reads a CSV/Parquet file in chunks,
+# scores the chunks on a process pool with the model the API would serve
+# (registry CURRENT + metrics.json selection) and writes input + prediction
+# as Parquet (or CSV). Only a few chunks are in memory at any time.
+#   python scripts/score.py rumah.parquet --output hasil.parquet --chunk-size 100000 --workers 8
+
+def resolve_model(config, version=None, slot=None):
+    """(model_dir, model_version, slot) the API would serve, or the requested version/slot"""
+    registry_dir = registry.get_registry_dir(config)
+    model_version = version or registry.current_version(registry_dir)
+    if version and not os.path.isdir(registry.version_dir(registry_dir, version)):
+        raise SystemExit(f"Unknown model version: {version}")
+    model_dir = registry.version_dir(registry_dir, model_version) if model_version else os.path.join(utils.BASE_DIR, "models")
+
+    models, model_metadata = model_loader.load_models(model_dir, legacy_dir=os.path.join(utils.BASE_DIR, "models"))
+    if slot is None:
+        slot = model_loader.select_active_model(models, model_metadata, config.get("model_selection", {}))
+    if slot not in models:
+        raise SystemExit(f"No model {slot or ''} in {model_dir}")
+    print(f"Scoring with {model_loader.model_label(slot, model_metadata)} (version: {model_version or 'unversioned'})")
+    return model_dir, model_version, slot
+
+def read_chunks(path, chunk_size):
+    """DataFrames of at most chunk_size rows from a .csv or .parquet file"""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+class ChunkWriter:
+    """Appends scored chunks to one Parquet (default) or CSV file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = not path.endswith(".csv")
+        self._writer = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def write(self, df):
+        if not self.parquet:
+            df.to_csv(self.path, mode="w" if self._writer is None else "a", header=self._writer is None, index=False)
+            self._writer = True
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        elif table.schema != self._writer.schema:
+            # e.g. a column that is all-null in this chunk
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self.parquet and self._writer is not None:
+            self._writer.close()
+
+def _init_worker(model_dir, slot):
+    # Each worker loads the model once instead of receiving it with every chunk
+    global _model
+    models, _ = model_loader.load_models(model_dir, legacy_dir=os.path.join(utils.BASE_DIR, "models"), slots={slot})
+    _model = models[slot]
+
+def score_chunk(features):
+    """Predictions for one chunk of feature columns; NaN for rows with missing or non-numeric values"""
+    values = features.apply(pd.to_numeric, errors="coerce")
+    valid = values.notna().all(axis=1).to_numpy()
+    predictions = np.full(len(values), np.nan)
+    if valid.any():
+        predictions[valid] = _model.predict(values[valid].astype("int64"))
+    return predictions
+
+def score_file(args):
+    config = utils.load_params(utils.get_config_path())
+    predictors = config["prediktor"]
+    model_dir, model_version, slot = resolve_model(config, args.version, args.model)
+    workers = args.workers or os.cpu_count()
+
+    writer = ChunkWriter(args.output)
+    rows = invalid = 0
+    start = time.perf_counter()
+    # At most 2 chunks per worker in flight, so memory does not grow with the file
+    in_flight = deque()
+
+    def collect():
+        nonlocal rows, invalid
+        chunk, future = in_flight.popleft()
+        chunk[args.prediction_column] = future.result()
+        writer.write(chunk)
+        rows += len(chunk)
+        invalid += int(chunk[args.prediction_column].isna().sum())
+        elapsed = time.perf_counter() - start
+        print(f"  {rows} rows scored ({rows / elapsed:.0f} rows/s)")
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_dir, slot)) as pool:
+            for chunk in read_chunks(args.input, args.chunk_size):
+                missing = [p for p in predictors if p not in chunk.columns]
+                if missing:
+                    raise SystemExit(f"Missing feature columns in {args.input}: {missing}")
+                in_flight.append((chunk, pool.submit(score_chunk, chunk[predictors])))
+                if len(in_flight) >= 2 * workers:
+                    collect()
+            while in_flight:
+                collect()
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Scored {rows} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):.0f} rows/s, "
+          f"{workers} workers, chunk size {args.chunk_size}) -> {args.output}")
+    if invalid:
+        print(f"{invalid} rows had missing or invalid features (empty {args.prediction_column})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file with the served house price model")
+    parser.add_argument("input", help=".csv or .parquet file with the predictor columns")
+    parser.add_argument("--output", default=None, help="output file, .parquet or .csv (default: <input>_scored.parquet)")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="rows per chunk")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--version", default=None, help="registry version to score with (default: CURRENT)")
+    parser.add_argument("--model", default=None, help="model slot, e.g. model2 (default: the model the API serves)")
+    parser.add_argument("--prediction-column", default="prediction")
+    args = parser.parse_args()
+
+    if args.output is None:
+        args.output = os.path.splitext(args.input)[0] + "_scored.parquet"
+    score_file(args)
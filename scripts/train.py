@@ -1,26 +1,64 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import train_test_split, KFold
 from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
 from sklearn.metrics import mean_absolute_percentage_error, r2_score
 import joblib
 import os
 import sys
 import json
 import datetime
+import argparse
+import yaml
+import time
+import hashlib
+import itertools
+import copy
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from threadpoolctl import threadpool_limits
 
 # Paths
 ROOT_DIR = os.getcwd()
 DATA_PATH = os.path.join(ROOT_DIR, "data", "raw", "DATA RUMAH.xlsx")
-MODEL_DIR = os.path.join(ROOT_DIR, "api", "models")
-MODEL_1_PATH = os.path.join(MODEL_DIR, "model_1.pkl")
-MODEL_2_PATH = os.path.join(MODEL_DIR, "model_2.pkl")
-METRICS_PATH = os.path.join(MODEL_DIR, "metrics.json")
+CONFIG_PATH = os.path.join(ROOT_DIR, "config", "params.yaml")
+sys.path.insert(0, os.path.join(ROOT_DIR, "api"))
+import registry
 
-def train():
-    print("Starting training process...")
-    
+FEATURES = ["LB", "LT", "KT", "KM", "GRS"]
+TARGET = "HARGA"
+
+# Estimators usable in the `training.candidates` search space of params.yaml
+MODEL_CLASSES = {
+    "LinearRegression": LinearRegression,
+    "RandomForestRegressor": RandomForestRegressor,
+    "HistGradientBoostingRegressor": HistGradientBoostingRegressor
+}
+TREE_ENSEMBLES = {"RandomForestRegressor"}
+SEEDED = {"RandomForestRegressor", "HistGradientBoostingRegressor"}
+
+# Used when params.yaml has no `compression` section: keep the full forest
+DEFAULT_COMPRESSION = {"enabled": False, "joblib_compress": 0}
+
+# Used when params.yaml has no `training` section
+DEFAULT_TRAINING = {
+    "cv_folds": 5,
+    "random_state": 42,
+    "cv_cache_path": "data/processed/cv_cache.json",
+    "fit_cache_dir": "data/processed/fit_cache",
+    "candidates": {
+        "model1": {"name": "Linear Regression", "estimator": "LinearRegression", "grid": {}},
+        "model2": {"name": "Random Forest Regressor", "estimator": "RandomForestRegressor",
+                   "grid": {"n_estimators": [100]}}
+    }
+}
+
+def load_config():
+    with open(CONFIG_PATH, "r") as f:
+        return yaml.safe_load(f)
+
+def load_raw_split():
     if not os.path.exists(DATA_PATH):
         print(f"Error: Data file not found at {DATA_PATH}")
         sys.exit(1)
@@ -30,81 +68,395 @@ def train():
     df = pd.read_excel(DATA_PATH)
     
     # 2. Preprocessing
-    # Filter features
-    features = ["LB", "LT", "KT", "KM", "GRS"]
-    target = "HARGA"
-    
     # Simple cleaning: Drop NaNs
-    df = df.dropna(subset=features + [target])
+    df = df.dropna(subset=FEATURES + [TARGET])
     
     # Outlier Removal (Simple IQR) for Price
-    Q1 = df[target].quantile(0.25)
-    Q3 = df[target].quantile(0.75)
+    Q1 = df[TARGET].quantile(0.25)
+    Q3 = df[TARGET].quantile(0.75)
     IQR = Q3 - Q1
     lower_bound = Q1 - 1.5 * IQR
     upper_bound = Q3 + 1.5 * IQR
     
-    df_clean = df[(df[target] >= lower_bound) & (df[target] <= upper_bound)]
+    df_clean = df[(df[TARGET] >= lower_bound) & (df[TARGET] <= upper_bound)]
     print(f"Data shape after cleaning: {df_clean.shape} (Original: {df.shape})")
     
-    X = df_clean[features]
-    y = df_clean[target]
+    X = df_clean[FEATURES]
+    y = df_clean[TARGET]
     
     # 3. Split
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    
-    # 4. Train Model 1 (Linear Regression) - Primary
-    print("Training Model 1 (Linear Regression)...")
-    model1 = LinearRegression()
-    model1.fit(X_train, y_train)
-    
-    # Evaluate Model 1
-    y_pred1 = model1.predict(X_test)
-    mape1 = mean_absolute_percentage_error(y_test, y_pred1)
-    r2_1 = r2_score(y_test, y_pred1)
-    
-    print(f"Model 1 Performance:")
-    print(f"MAPE: {mape1:.2%}")
-    print(f"R2 Score: {r2_1:.4f}")
-    
-    # 5. Train Model 2 (Random Forest) - Backup
-    print("Training Model 2 (Random Forest)...")
-    model2 = RandomForestRegressor(n_estimators=100, random_state=42)
-    model2.fit(X_train, y_train)
-    
-    # Evaluate Model 2
-    y_pred2 = model2.predict(X_test)
-    mape2 = mean_absolute_percentage_error(y_test, y_pred2)
-    r2_2 = r2_score(y_test, y_pred2)
-    
-    print(f"Model 2 Performance:")
-    print(f"MAPE: {mape2:.2%}")
-    print(f"R2 Score: {r2_2:.4f}")
-    
-    # 6. Save Models
-    os.makedirs(MODEL_DIR, exist_ok=True)
-    joblib.dump(model1, MODEL_1_PATH)
-    joblib.dump(model2, MODEL_2_PATH)
-    print(f"Models saved to {MODEL_DIR}")
-
-    # 7. Save Metrics
-    metrics_data = {
-        "model1": {
-            "name": "Linear Regression",
-            "mape": mape1,
-            "r2": r2_1
-        },
-        "model2": {
-            "name": "Random Forest Regressor",
-            "mape": mape2,
-            "r2": r2_2
-        },
-        "last_updated": datetime.datetime.now().strftime("%d %B %Y %H:%M")
+    return train_test_split(X, y, test_size=0.2, random_state=42)
+
+def load_clean_split():
+    # Outlier-cleaned train set from the preprocessing stage, evaluated on
+    # the held-out test set written by data_preparation.py
+    config = load_config()
+    paths = config["train_clean_set_path"] + config["test_set_path"]
+    for rel_path in paths:
+        if not os.path.exists(os.path.join(ROOT_DIR, rel_path)):
+            print(f"Error: {rel_path} not found. Run api/preprocessing.py first.")
+            sys.exit(1)
+
+    print("Loading cleaned training set...")
+    X_train, y_train, X_test, y_test = [joblib.load(os.path.join(ROOT_DIR, p)) for p in paths]
+    print(f"Train shape: {X_train.shape}, Test shape: {X_test.shape}")
+    return X_train[FEATURES], X_test[FEATURES], y_train[TARGET], y_test[TARGET]
+
+# -----------------------------------------------------------------------------
+# TRAINING ENGINE (k-fold CV over the search space, folds fitted in parallel)
+# -----------------------------------------------------------------------------
+def expand_candidates(candidates):
+    # One entry per grid point: (slot, estimator name, params)
+    expanded = []
+    for slot, spec in candidates.items():
+        grid = spec.get("grid") or {}
+        keys = sorted(grid)
+        for values in itertools.product(*(grid[k] for k in keys)):
+            expanded.append((slot, spec["estimator"], dict(zip(keys, values))))
+    return expanded
+
+def make_model(estimator, params, random_state, n_jobs=None):
+    model_params = dict(params)
+    if estimator in SEEDED:
+        model_params.setdefault("random_state", random_state)
+    if estimator in TREE_ENSEMBLES:
+        model_params["n_jobs"] = n_jobs
+    return MODEL_CLASSES[estimator](**model_params)
+
+def describe(estimator, params):
+    args = ", ".join(f"{k}={v}" for k, v in sorted(params.items()))
+    return f"{estimator}({args})"
+
+def data_hash(X, y):
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+    digest.update(pd.util.hash_pandas_object(y, index=False).values.tobytes())
+    digest.update(",".join(X.columns).encode())
+    return digest.hexdigest()
+
+def fold_key(dhash, estimator, params, fold, n_folds, random_state):
+    raw = json.dumps([dhash, estimator, params, fold, n_folds, random_state], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+# Training data shared with pool workers once through the initializer
+_X = None
+_y = None
+
+def _init_worker(X, y):
+    global _X, _y
+    _X, _y = X, y
+    # One BLAS/OpenMP thread per worker (HistGradientBoosting would otherwise
+    # start a thread per core in every worker), the pool already uses every core
+    threadpool_limits(1)
+
+def fit_fold(estimator, params, random_state, train_idx, val_idx):
+    # Workers fit single-threaded, the pool already uses every core
+    model = make_model(estimator, params, random_state, n_jobs=1)
+    start = time.perf_counter()
+    model.fit(_X.iloc[train_idx], _y.iloc[train_idx])
+    fit_time = time.perf_counter() - start
+
+    y_pred = model.predict(_X.iloc[val_idx])
+    return {
+        "mape": mean_absolute_percentage_error(_y.iloc[val_idx], y_pred),
+        "r2": r2_score(_y.iloc[val_idx], y_pred),
+        "fit_time": fit_time
+    }
+
+def measure_latency(model, X, repeats=200):
+    # Single-row predict latency (p50, p99) in milliseconds, the way the API calls it
+    row = X.iloc[[0]]
+    model.predict(row)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(row)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 99))
+
+def measure_artifact(model, X, compress=0):
+    # Bytes on disk, joblib.load time and single-row latency of a model
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "model.pkl")
+        joblib.dump(model, path, compress=compress)
+        size_bytes = os.path.getsize(path)
+        start = time.perf_counter()
+        joblib.load(path)
+        load_time_ms = (time.perf_counter() - start) * 1000
+    latency_p50, latency_p99 = measure_latency(model, X)
+    return {
+        "size_bytes": size_bytes,
+        "load_time_ms": load_time_ms,
+        "latency_ms": latency_p50,
+        "latency_p99_ms": latency_p99
+    }
+
+def load_cv_cache(cache_path):
+    if os.path.exists(cache_path):
+        with open(cache_path, "r") as f:
+            return json.load(f)
+    return {}
+
+def save_cv_cache(cache_path, cache):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, cache_path)
+
+def fit_cached(estimator, params, random_state, X, y, cache_dir):
+    """Fit on (X, y) with all cores, or load the model fitted earlier on the
+    same data with the same estimator/params. Returns (model, fit_time)."""
+    key = fold_key(data_hash(X, y), estimator, params, "fit", None, random_state)
+    path = os.path.join(cache_dir, f"{key}.pkl")
+    if os.path.exists(path):
+        cached = joblib.load(path)
+        return cached["model"], cached["fit_time"]
+
+    model = make_model(estimator, params, random_state, n_jobs=-1)
+    start = time.perf_counter()
+    model.fit(X, y)
+    fit_time = time.perf_counter() - start
+    if estimator in TREE_ENSEMBLES:
+        # Serve single-threaded: one-row predictions only pay thread dispatch
+        model.set_params(n_jobs=None)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = path + ".tmp"
+    joblib.dump({"model": model, "fit_time": fit_time}, tmp_path)
+    os.replace(tmp_path, path)
+    return model, fit_time
+
+def cross_validate(candidates, X, y, training, jobs=None):
+    n_folds = training["cv_folds"]
+    random_state = training["random_state"]
+    cache_path = os.path.join(ROOT_DIR, training["cv_cache_path"])
+    cache = load_cv_cache(cache_path)
+    dhash = data_hash(X, y)
+
+    folds = list(KFold(n_splits=n_folds, shuffle=True, random_state=random_state).split(X))
+    fold_results = {}
+    pending = []
+    for i, (slot, estimator, params) in enumerate(candidates):
+        for f, (train_idx, val_idx) in enumerate(folds):
+            key = fold_key(dhash, estimator, params, f, n_folds, random_state)
+            if key in cache:
+                fold_results[(i, f)] = cache[key]
+            else:
+                pending.append((i, f, key, estimator, params, train_idx, val_idx))
+
+    print(f"Cross-validating {len(candidates)} candidates x {n_folds} folds "
+          f"({len(fold_results)} fold results cached, {len(pending)} to fit)...")
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(X, y)) as pool:
+            futures = {
+                pool.submit(fit_fold, estimator, params, random_state, train_idx, val_idx): (i, f, key)
+                for i, f, key, estimator, params, train_idx, val_idx in pending
+            }
+            for future, (i, f, key) in futures.items():
+                fold_results[(i, f)] = cache[key] = future.result()
+        save_cv_cache(cache_path, cache)
+
+    summary = []
+    for i, (slot, estimator, params) in enumerate(candidates):
+        results = [fold_results[(i, f)] for f in range(n_folds)]
+        summary.append({
+            "slot": slot,
+            "estimator": estimator,
+            "params": params,
+            "cv_mape": float(np.mean([r["mape"] for r in results])),
+            "cv_r2": float(np.mean([r["r2"] for r in results])),
+            "fit_time": float(np.mean([r["fit_time"] for r in results]))
+        })
+
+    width = max(len(describe(row["estimator"], row["params"])) for row in summary) + 2
+    print(f"\n{'Slot':<8}{'Candidate':<{width}}{'Fit time':>10}{'CV MAPE':>10}{'CV R2':>9}")
+    for row in summary:
+        print(f"{row['slot']:<8}{describe(row['estimator'], row['params']):<{width}}"
+              f"{row['fit_time']:>9.3f}s{row['cv_mape']:>10.2%}{row['cv_r2']:>9.4f}")
+    print()
+    return summary
+
+# -----------------------------------------------------------------------------
+# FOREST COMPRESSION (smallest forest within tolerance of the full one)
+# -----------------------------------------------------------------------------
+def subset_forest(model, n_estimators):
+    # First n trees of an already fitted forest, no refit needed
+    small = copy.deepcopy(model)
+    small.estimators_ = small.estimators_[:n_estimators]
+    small.n_estimators = n_estimators
+    return small
+
+def compress_forest(best, X_train, y_train, compression, random_state, cache_dir):
+    """Try pruned and smaller variants of the chosen forest and return the params
+    of the smallest one within the R2/MAPE tolerance of the full forest.
+    Variants are fitted on part of the training set and compared on a held-out
+    validation split, so the test set stays untouched for the final report."""
+    level = compression.get("joblib_compress", 0)
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train, y_train, test_size=compression.get("validation_size", 0.2), random_state=random_state
+    )
+
+    # The whole comparison is cached: same data, winner and settings -> same choice
+    key = fold_key(data_hash(X_train, y_train), best["estimator"], best["params"], "compress",
+                   json.dumps(compression, sort_keys=True), random_state)
+    cache_path = os.path.join(cache_dir, f"{key}.json")
+    if os.path.exists(cache_path):
+        with open(cache_path, "r") as f:
+            cached = json.load(f)
+        print(f"Compression choice cached: {cached['report']['variant']}")
+        return cached["params"], cached["report"]
+
+    def evaluate(label, params, variant):
+        y_pred = variant.predict(X_val)
+        row = {
+            "variant": label,
+            "params": params,
+            "r2": r2_score(y_val, y_pred),
+            "mape": mean_absolute_percentage_error(y_val, y_pred)
+        }
+        row.update(measure_artifact(variant, X_val, level))
+        return row
+
+    # Pruned refits (shallower trees / bigger leaves) next to the full forest
+    bases = [("full", dict(best["params"]))]
+    for depth in compression.get("max_depth", []):
+        for leaf in compression.get("min_samples_leaf", []):
+            bases.append((f"max_depth={depth}, min_samples_leaf={leaf}",
+                          dict(best["params"], max_depth=depth, min_samples_leaf=leaf)))
+
+    variants = []
+    for base_label, base_params in bases:
+        base, _ = fit_cached(best["estimator"], base_params, random_state, X_fit, y_fit, cache_dir)
+        # Fewer estimators: the first n trees equal a forest fitted with n_estimators=n
+        sizes = [n for n in compression.get("n_estimators", []) if n < len(base.estimators_)]
+        for n in sizes + [len(base.estimators_)]:
+            candidate = subset_forest(base, n) if n < len(base.estimators_) else base
+            label = "full" if base_label == "full" and candidate is base else f"{base_label}, n_estimators={n}"
+            variants.append(evaluate(label, dict(base_params, n_estimators=n), candidate))
+    full = next(v for v in variants if v["variant"] == "full")
+
+    r2_floor = full["r2"] - compression.get("r2_tolerance", 0)
+    mape_ceiling = full["mape"] + compression.get("mape_tolerance", 0)
+    accepted = [v for v in variants if v["r2"] >= r2_floor and v["mape"] <= mape_ceiling]
+    chosen = min(accepted, key=lambda v: (v["size_bytes"], v["latency_p99_ms"]))
+
+    print(f"{'Variant (validation split)':<60}{'Size KB':>10}{'Load ms':>9}{'p99 ms':>8}{'MAPE':>9}{'R2':>8}")
+    for v in variants:
+        mark = " *" if v is chosen else ("" if v in accepted else " x")
+        print(f"{v['variant']:<60}{v['size_bytes'] / 1024:>10.1f}{v['load_time_ms']:>9.1f}"
+              f"{v['latency_p99_ms']:>8.2f}{v['mape']:>9.2%}{v['r2']:>8.4f}{mark}")
+
+    report = {
+        "variant": chosen["variant"],
+        "full_size_bytes": full["size_bytes"],
+        "full_val_r2": full["r2"],
+        "full_val_mape": full["mape"],
+        "val_r2": chosen["r2"],
+        "val_mape": chosen["mape"]
     }
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_path, "w") as f:
+        json.dump({"params": chosen["params"], "report": report}, f)
+    return chosen["params"], report
+
+def train(dataset="raw", jobs=None):
+    print("Starting training process...")
+
+    if dataset == "clean":
+        X_train, X_test, y_train, y_test = load_clean_split()
+    else:
+        X_train, X_test, y_train, y_test = load_raw_split()
+
+    config = load_config()
+    training = config.get("training", DEFAULT_TRAINING)
+    compression = config.get("compression", DEFAULT_COMPRESSION)
+    compress_level = compression.get("joblib_compress", 0)
+    candidates = training["candidates"]
+    fit_cache_dir = os.path.join(ROOT_DIR, training.get("fit_cache_dir", DEFAULT_TRAINING["fit_cache_dir"]))
+
+    # 4. Model selection: best CV R2 per slot (model1, model2, ...)
+    summary = cross_validate(expand_candidates(candidates), X_train, y_train, training, jobs)
+
+    # Artifacts are written to a staging directory and only published to the
+    # registry once complete, so the API never sees a half-written pickle
+    metrics_data = {}
+    registry_dir = registry.get_registry_dir(config)
+    os.makedirs(registry_dir, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(dir=registry_dir, prefix=".staging-")
+    for idx, slot in enumerate(candidates, start=1):
+        best = max((row for row in summary if row["slot"] == slot), key=lambda row: row["cv_r2"])
+        name = candidates[slot].get("name", best["estimator"])
+
+        # Forests: pick the smallest variant within tolerance (validation split of the train set)
+        params = best["params"]
+        compression_report = None
+        if best["estimator"] in TREE_ENSEMBLES and compression.get("enabled", False):
+            print(f"Compressing {slot} ({name})...")
+            params, compression_report = compress_forest(
+                best, X_train, y_train, compression, training["random_state"], fit_cache_dir
+            )
+
+        # 5. Refit the winner on the full training set (cached like the folds)
+        print(f"Training {slot} ({name}): {describe(best['estimator'], params)}...")
+        model, fit_time = fit_cached(best["estimator"], params, training["random_state"],
+                                     X_train, y_train, fit_cache_dir)
+
+        # Evaluate on the held-out test set (used for nothing but this report)
+        y_pred = model.predict(X_test)
+        mape = mean_absolute_percentage_error(y_test, y_pred)
+        r2 = r2_score(y_test, y_pred)
+
+        # 6. Save Model
+        model_path = os.path.join(staging_dir, f"model_{idx}.pkl")
+        joblib.dump(model, model_path, compress=compress_level)
+        artifact = measure_artifact(model, X_test, compress_level)
+
+        print(f"{name} Performance:")
+        print(f"MAPE: {mape:.2%}")
+        print(f"R2 Score: {r2:.4f}")
+        print(f"Fit time: {fit_time:.3f}s, Size: {artifact['size_bytes'] / 1024:.1f} KB, "
+              f"Load: {artifact['load_time_ms']:.1f} ms, "
+              f"Latency: {artifact['latency_ms']:.2f} ms (p99 {artifact['latency_p99_ms']:.2f} ms)")
+
+        metrics_data[slot] = {
+            "name": name,
+            "mape": mape,
+            "r2": r2,
+            "params": params,
+            "cv_mape": best["cv_mape"],
+            "cv_r2": best["cv_r2"],
+            "fit_time": fit_time,
+            **artifact
+        }
+        if compression_report:
+            metrics_data[slot]["compression"] = compression_report
+
+    # 7. Save Metrics, reference profile (drift baseline) and feature schema
+    metrics_data["last_updated"] = datetime.datetime.now().strftime("%d %B %Y %H:%M")
     
-    with open(METRICS_PATH, "w") as f:
+    with open(os.path.join(staging_dir, "metrics.json"), "w") as f:
         json.dump(metrics_data, f, indent=4)
-    print(f"Metrics saved to {METRICS_PATH}")
+    joblib.dump(X_train, os.path.join(staging_dir, "reference.pkl"))
+
+    schema = {
+        "features": FEATURES,
+        "target": TARGET,
+        "dtypes": {f: str(X_train[f].dtype) for f in FEATURES},
+        "ranges": {f: config.get(f"rentang_{f}") for f in FEATURES}
+    }
+    with open(os.path.join(staging_dir, "schema.json"), "w") as f:
+        json.dump(schema, f, indent=4)
+
+    # 8. Publish
+    version = registry.publish(registry_dir, staging_dir, keep=config.get("registry_keep"))
+    print(f"Published model version {version} to {registry_dir}")
 
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser(description="Train house price models")
+    parser.add_argument("--dataset", choices=["raw", "clean"], default="raw",
+                        help="raw: Excel file with price IQR filter, clean: preprocessing.py pickles")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="worker processes for cross-validation (default: all cores)")
+    args = parser.parse_args()
+    train(args.dataset, args.jobs)
@@ -0,0 +1,74 @@
+import requests
+import threading
+import time
+import sys
+import os
+
+# Hammer every endpoint concurrently to catch races in the shared API state
+# (e.g. "deque mutated during iteration" on /logs while /predict is writing).
+# Start the API first: python api/app.py (set ADMIN_TOKEN to include /admin/reload)
+
+base_url = os.environ.get("API_URL", "http://localhost:5000")
+duration = 15            # seconds
+threads_per_endpoint = 4
+admin_token = os.environ.get("ADMIN_TOKEN")
+
+data = {
+    "LB": 100,
+    "LT": 120,
+    "KT": 3,
+    "KM": 2,
+    "GRS": 1
+}
+
+calls = [
+    ("POST", "/predict", data),
+    ("POST", "/predict/batch", {"instances": [data] * 20}),
+    ("GET", "/logs", None),
+    ("GET", "/drift", None),
+    ("GET", "/metrics", None),
+    ("GET", "/metrics/runtime", None)
+]
+if admin_token:
+    calls.append(("POST", "/admin/reload", None))
+
+results = {path: {"ok": 0, "failed": 0, "errors": set()} for _, path, _ in calls}
+lock = threading.Lock()
+stop_at = time.time() + duration
+
+def hammer(method, path, payload):
+    session = requests.Session()
+    headers = {"X-Admin-Token": admin_token} if admin_token else {}
+    while time.time() < stop_at:
+        try:
+            response = session.request(method, base_url + path, json=payload, headers=headers, timeout=30)
+            ok = response.status_code == 200
+            error = None if ok else f"{response.status_code}: {response.text[:120]}"
+        except Exception as e:
+            ok, error = False, str(e)
+        with lock:
+            results[path]["ok" if ok else "failed"] += 1
+            if error:
+                results[path]["errors"].add(error)
+
+print(f"Stressing {base_url} for {duration}s with {threads_per_endpoint} threads per endpoint...")
+workers = [
+    threading.Thread(target=hammer, args=call)
+    for call in calls
+    for _ in range(threads_per_endpoint)
+]
+for w in workers:
+    w.start()
+for w in workers:
+    w.join()
+
+failed = 0
+print(f"\n{'Endpoint':<18}{'OK':>8}{'Failed':>8}")
+for path, r in results.items():
+    print(f"{path:<18}{r['ok']:>8}{r['failed']:>8}")
+    failed += r["failed"]
+    for error in sorted(r["errors"])[:3]:
+        print(f"    {error}")
+
+print("\nPASSED" if failed == 0 else f"\nFAILED: {failed} failed requests")
+sys.exit(1 if failed else 0)
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The API modules are imported by name (import util, import log_buffer, ...)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "api"))
+# The pipeline runner lives in scripts/
+sys.path.insert(0, os.path.join(ROOT_DIR, "scripts"))
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+import app as api_app
+
+@pytest.fixture(scope="module")
+def client():
+    return api_app.app.test_client()
+
+def test_batch_rejects_malformed_json(client):
+    response = client.post("/predict/batch", data="{not json", content_type="application/json")
+    assert response.status_code == 400
+    assert response.get_json()["status"] == "error"
+
+def test_batch_rejects_body_without_content_type(client):
+    response = client.post("/predict/batch", data='{"instances": []}')
+    assert response.status_code == 400
+
+PAYLOAD = {"LB": 100, "LT": 120, "KT": 3, "KM": 2, "GRS": 1}
+
+def test_predict_details_keep_every_model_key(client):
+    details = client.post("/predict", json=PAYLOAD).get_json()["details"]
+    active_slot = api_app.serving["active_slot"]
+
+    assert {"model1", "model2"} <= set(details)
+    assert details["all_models"] is False
+    assert details[active_slot]["prediction"] is not None
+    assert all(details[s]["prediction"] is None for s in api_app.serving["models"] if s != active_slot)
+
+def test_predict_all_models_runs_every_model(client):
+    details = client.post("/predict?all_models=1", json=PAYLOAD).get_json()["details"]
+    assert details["all_models"] is True
+    assert all(details[s]["prediction"] is not None for s in api_app.serving["models"])
+
+@pytest.mark.parametrize("value", [1.5, float("inf"), "1.5", "abc", None])
+def test_stream_row_rejects_non_integers(value):
+    predictors = ["LB", "LT"]
+    line = json.dumps({"LB": value, "LT": 2})
+    with pytest.raises(ValueError, match="LB must be an integer"):
+        api_app.parse_stream_row(line, predictors)
+
+def test_stream_row_accepts_whole_numbers():
+    assert api_app.parse_stream_row('{"LB": 100.0, "LT": "120"}', ["LB", "LT"]) == {"LB": 100, "LT": 120}
+    assert api_app.parse_stream_row("100,120", ["LB", "LT"], csv_header=["LB", "LT"]) == {"LB": 100, "LT": 120}
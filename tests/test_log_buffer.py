@@ -0,0 +1,87 @@
+import numpy as np
+
+import log_buffer
+import log_store
+
+FEATURES = ["LB", "LT"]
+
+def record(i, status="success", input=None, model="Model 1"):
+    return {
+        "ts_ms": 1000 + i,
+        "input": {"LB": i, "LT": 2 * i} if input is None else input,
+        "prediction": float(i) if status == "success" else None,
+        "status": status,
+        "model_used": model
+    }
+
+def test_ring_wraps_around():
+    buffer = log_buffer.ColumnarLogBuffer(4, FEATURES)
+    buffer.append_batch([record(i) for i in range(3)])
+    buffer.append_batch([record(i) for i in range(3, 6)])
+
+    assert len(buffer) == 4
+    cols = buffer.columns()
+    # Oldest first, the two oldest rows were overwritten
+    assert cols["ts_ms"].tolist() == [1002, 1003, 1004, 1005]
+    assert cols["features"][0].tolist() == [2, 3, 4, 5]
+    assert buffer.columns(last=2)["prediction"].tolist() == [4.0, 5.0]
+    assert buffer.feature_frame(last=3)["LT"].tolist() == [6, 8, 10]
+
+def test_window_skips_newest_rows_across_wrap():
+    buffer = log_buffer.ColumnarLogBuffer(4, FEATURES)
+    buffer.append_batch([record(i) for i in range(6)])  # holds 2..5, next write at 2
+
+    assert buffer.columns(skip=1)["ts_ms"].tolist() == [1002, 1003, 1004]
+    assert buffer.columns(skip=2)["ts_ms"].tolist() == [1002, 1003]
+    assert buffer.columns(last=1, skip=3)["ts_ms"].tolist() == [1002]
+    assert buffer.columns(skip=4)["ts_ms"].tolist() == []
+
+def test_batch_larger_than_capacity_keeps_newest():
+    buffer = log_buffer.ColumnarLogBuffer(3, FEATURES)
+    buffer.append_batch([record(i) for i in range(5)])
+    assert buffer.columns()["ts_ms"].tolist() == [1002, 1003, 1004]
+
+def test_malformed_input_in_batch():
+    buffer = log_buffer.ColumnarLogBuffer(8, FEATURES)
+    buffer.append_batch([
+        record(1),
+        record(2, "error", input=5),
+        record(3, "error", input=["LB"]),
+        record(4, "error", input={"LB": "abc", "LT": None}),
+        record(5)
+    ])
+
+    assert len(buffer) == 5
+    assert buffer.columns()["features"][0].tolist() == [1, 0, 0, 0, 5]
+    assert np.isnan(buffer.columns()["prediction"][1:4]).all()
+    assert buffer.feature_frame()["LB"].tolist() == [1, 5]
+
+def test_out_of_range_input_in_batch():
+    buffer = log_buffer.ColumnarLogBuffer(8, FEATURES)
+    buffer.append_batch([
+        record(1),
+        record(2, "error", input={"LB": 10 ** 20, "LT": 10 ** 10}),
+        record(3, "error", input={"LB": float("inf"), "LT": -2 ** 31}),
+        record(4)
+    ])
+
+    assert len(buffer) == 4
+    assert buffer.columns()["features"].T.tolist() == [[1, 2], [0, 0], [0, -2 ** 31], [4, 8]]
+
+def test_summary_counts_status_and_models():
+    buffer = log_buffer.ColumnarLogBuffer(8, FEATURES)
+    buffer.append_batch([record(0), record(1, model="Model 2"), record(2, "error", input=5, model="Unknown")])
+    assert buffer.summary() == {
+        "total_requests": 3,
+        "success_count": 2,
+        "error_count": 1,
+        "model_counts": {"Model 1": 1, "Model 2": 1, "Unknown": 1}
+    }
+
+def test_memory_store_keeps_logs_and_summary_in_sync():
+    store = log_store.MemoryLogStore(FEATURES, history_size=16, recent_size=16)
+    store.write_batch([record(0), record(1, "error", input=5), record(2)])
+
+    assert len(store.recent(10)) == store.summary()["total_requests"] == 3
+    assert store.recent(10, status="error")[0]["input"] == 5
+    assert store.feature_frame(10)["LB"].tolist() == [0, 2]
@@ -0,0 +1,56 @@
+import log_store
+
+FEATURES = ["LB", "LT"]
+
+def record(i, status="success", input=None):
+    return {
+        "ts_ms": 1000 + i,
+        "input": {"LB": i, "LT": 2 * i} if input is None else input,
+        "prediction": float(i) if status == "success" else None,
+        "status": status,
+        "model_used": "Model 1"
+    }
+
+def test_sqlite_store_keeps_malformed_record(tmp_path):
+    store = log_store.SQLiteLogStore(str(tmp_path / "predictions.db"), FEATURES, history_size=100, recent_size=100)
+    store.write_batch([record(0), record(1, "error", input=5), record(2, "error", input={"LB": "abc"}), record(3)])
+
+    assert len(store) == 4
+    assert store.summary()["error_count"] == 2
+    assert [e["input"] for e in store.recent(10, status="error")] == [{"LB": "abc"}, 5]
+    assert store.feature_frame(10)["LB"].tolist() == [0, 3]
+
+def test_sqlite_store_retention(tmp_path):
+    store = log_store.SQLiteLogStore(str(tmp_path / "predictions.db"), FEATURES, history_size=3, recent_size=10)
+    store.write_batch([record(i) for i in range(5)])
+    assert [e["ts_ms"] for e in store.recent(10)] == [1004, 1003, 1002]
+
+def test_sqlite_store_keeps_out_of_range_record(tmp_path):
+    store = log_store.SQLiteLogStore(str(tmp_path / "predictions.db"), FEATURES, history_size=100, recent_size=100)
+    store.write_batch([record(0), record(1, "error", input={"LB": 10 ** 20, "LT": 10 ** 10}), record(2)])
+
+    assert len(store) == 3
+    assert store.recent(1, status="error")[0]["input"]["LB"] == 10 ** 20
+
+def test_sqlite_workers_share_dropped_count_and_drift_rows(tmp_path):
+    # Two workers writing to the same file
+    path = str(tmp_path / "predictions.db")
+    first = log_store.SQLiteLogStore(path, FEATURES, history_size=100, recent_size=100)
+    second = log_store.SQLiteLogStore(path, FEATURES, history_size=100, recent_size=100)
+    first.write_batch([record(i) for i in range(3)], dropped=2)
+    second.write_batch([record(i) for i in range(3, 5)], dropped=1)
+
+    assert first.summary() == second.summary()
+    assert first.dropped() == second.dropped() == 3
+    assert first.feature_frame(10, until=3)["LB"].tolist() == second.feature_frame(10, until=3)["LB"].tolist() == [0, 1, 2]
+
+def test_memory_store_feature_frame_until(tmp_path):
+    store = log_store.MemoryLogStore(FEATURES, history_size=4, recent_size=4)
+    store.write_batch([record(i) for i in range(3)], dropped=1)
+    store.write_batch([record(i) for i in range(3, 6)])
+
+    assert store.version() == 6
+    # Ring of 4 holds entries 2..5; until=4 leaves out the two newest
+    assert store.feature_frame(10, until=4)["LB"].tolist() == [2, 3]
+    assert store.feature_frame(1, until=5)["LB"].tolist() == [4]
+    assert store.summary()["dropped_count"] == store.dropped() == 1
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+import micro_batch
+
+COLUMNS = ["LB", "LT"]
+
+class FakeModel:
+    def __init__(self, factor, fail=False):
+        self.factor = factor
+        self.fail = fail
+        self.calls = []
+
+    def predict(self, df):
+        self.calls.append(len(df))
+        if self.fail:
+            raise ValueError("broken model")
+        return df["LB"] * self.factor + df["LT"]
+
+def test_concurrent_rows_share_one_predict():
+    model = FakeModel(10)
+    models = {"model1": model}
+    batcher = micro_batch.MicroBatcher(COLUMNS, max_batch_size=3, max_latency=1.0)
+    futures = [batcher.submit(models, [i, 1]) for i in range(3)]
+
+    assert [f.result(timeout=5) for f in futures] == [{"model1": 1}, {"model1": 11}, {"model1": 21}]
+    assert model.calls == [3]
+
+def test_rows_are_grouped_by_model_dict():
+    # Rows queued before and after a reload are scored by their own snapshot
+    old, new = FakeModel(1), FakeModel(2)
+    old_models, new_models = {"m": old}, {"m": new}
+    batcher = micro_batch.MicroBatcher(COLUMNS, max_batch_size=4, max_latency=1.0)
+    futures = [batcher.submit(models, [5, 0]) for models in (old_models, new_models, old_models, new_models)]
+
+    assert [f.result(timeout=5)["m"] for f in futures] == [5, 10, 5, 10]
+    assert old.calls == [2] and new.calls == [2]
+
+def test_model_error_reaches_every_caller():
+    models = {"m": FakeModel(1, fail=True)}
+    batcher = micro_batch.MicroBatcher(COLUMNS, max_batch_size=2, max_latency=1.0)
+    futures = [batcher.submit(models, [i, 0]) for i in range(2)]
+    for future in futures:
+        with pytest.raises(ValueError, match="broken model"):
+            future.result(timeout=5)
+
+def test_batcher_keeps_serving_after_error():
+    batcher = micro_batch.MicroBatcher(COLUMNS, max_batch_size=1, max_latency=0.01)
+    with pytest.raises(ValueError):
+        batcher.submit({"m": FakeModel(1, fail=True)}, [1, 0]).result(timeout=5)
+    assert batcher.submit({"m": FakeModel(1)}, [1, 0]).result(timeout=5) == {"m": 1}
+
+def test_max_latency_closes_partial_batch():
+    model = FakeModel(1)
+    batcher = micro_batch.MicroBatcher(COLUMNS, max_batch_size=32, max_latency=0.01)
+    done = threading.Event()
+    future = batcher.submit({"m": model}, [7, 0])
+    future.add_done_callback(lambda _: done.set())
+    assert done.wait(timeout=5)
+    assert future.result() == {"m": 7} and model.calls == [1]
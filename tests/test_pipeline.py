@@ -0,0 +1,58 @@
+import pytest
+import yaml
+
+import pipeline
+
+def write_stage_script(root, name, exit_code=0):
+    # Copies its dep to its out, or fails
+    script = root / f"{name}.py"
+    script.write_text(
+        "import sys, shutil\n"
+        f"if {exit_code}: sys.exit({exit_code})\n"
+        f"shutil.copy('{name}_in.txt', '{name}_out.txt')\n"
+    )
+    return script
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Two-stage pipeline a -> b in tmp_path; returns a function that writes params.yaml"""
+    monkeypatch.setattr(pipeline, "ROOT_DIR", str(tmp_path))
+    monkeypatch.setattr(pipeline, "CONFIG_PATH", str(tmp_path / "params.yaml"))
+    (tmp_path / "a_in.txt").write_text("raw")
+
+    def configure(a_exit=0):
+        write_stage_script(tmp_path, "a", a_exit)
+        write_stage_script(tmp_path, "b")
+        (tmp_path / "b_in.txt").write_text("x")
+        config = {
+            "pipeline_lock_path": "pipeline.lock.json",
+            "stages": {
+                "a": {"cmd": "python a.py", "deps": ["a.py", "a_in.txt"], "outs": ["a_out.txt"]},
+                "b": {"cmd": "python b.py", "deps": ["b.py", "b_in.txt", "a_out.txt"], "outs": ["b_out.txt"]}
+            }
+        }
+        (tmp_path / "params.yaml").write_text(yaml.safe_dump(config))
+    return configure
+
+def test_failed_upstream_blocks_downstream(project, tmp_path, capsys):
+    project(a_exit=1)
+    assert pipeline.run_pipeline() is False
+    out = capsys.readouterr().out
+    assert "[b] blocked by failed upstream stage" in out
+    assert not (tmp_path / "b_out.txt").exists()
+
+def test_dry_run_reports_downstream_of_stale_stage(project, tmp_path, capsys):
+    project()
+    assert pipeline.run_pipeline() is True
+    capsys.readouterr()
+
+    # Everything fresh: nothing would run
+    pipeline.run_pipeline(dry_run=True)
+    out = capsys.readouterr().out
+    assert "[a] up to date" in out and "[b] up to date" in out
+
+    # a's input changed: a would run, so b would too
+    (tmp_path / "a_in.txt").write_text("new raw")
+    pipeline.run_pipeline(dry_run=True)
+    out = capsys.readouterr().out
+    assert "[a] would run" in out and "[b] would run" in out
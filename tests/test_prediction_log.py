@@ -0,0 +1,34 @@
+import threading
+
+import prediction_log
+
+def test_counters_add_up_under_concurrent_submits():
+    release = threading.Event()
+    writer = prediction_log.AsyncLogWriter(lambda batch: release.wait(5), capacity=10, batch_size=10,
+                                           policy=prediction_log.DROP)
+
+    def submit_many():
+        for i in range(2000):
+            writer.submit({"i": i})
+
+    threads = [threading.Thread(target=submit_many) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    release.set()
+
+    assert writer.accepted + writer.dropped == 8 * 2000
+    assert writer.dropped > 0
+
+def test_sample_policy_counts_evicted_records():
+    release = threading.Event()
+    writer = prediction_log.AsyncLogWriter(lambda batch: release.wait(5), capacity=4, batch_size=100,
+                                           flush_interval=10, policy=prediction_log.SAMPLE, sample_every=2)
+    results = [writer.submit({"i": i}) for i in range(12)]
+    release.set()
+
+    # 8 overflows: every 2nd evicts the oldest queued record, the others are dropped
+    assert results.count(False) == 4
+    assert writer.dropped == 8
+    assert writer.accepted == 8
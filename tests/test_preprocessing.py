@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import preprocessing
+
+def cek_data_loop(dataset, kolom, rentang, pengkali):
+    # Loop version of cek_data from before it was vectorized (reference)
+    data_outlier = pd.DataFrame()
+    blok = int(dataset[kolom].max() / rentang)
+    for i in range(1, blok):
+        data_blok = dataset[dataset[kolom] < rentang * i]
+        data_blok_cek_outlier = preprocessing.cek_outlier(data_blok, pengkali)
+        data_outlier = pd.concat([data_outlier, data_blok_cek_outlier])
+        dataset = dataset[~dataset.index.isin(data_blok.index)]
+    return data_outlier
+
+def make_dataset(seed, n=400):
+    rng = np.random.default_rng(seed)
+    lb = rng.integers(20, 900, n)
+    harga = lb * rng.normal(10_000_000, 2_000_000, n)
+    # A few expensive houses per block so every block has outliers to find
+    harga[rng.choice(n, n // 20, replace=False)] *= 8
+    return pd.DataFrame({"LB": lb, "HARGA": harga.astype(np.int64)}, index=rng.permutation(n) + 1000)
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("rentang,pengkali", [(150, 1.5), (100, 1.0), (1000, 1.5)])
+def test_cek_data_matches_loop(seed, rentang, pengkali):
+    dataset = make_dataset(seed)
+    expected = cek_data_loop(dataset, "LB", rentang, pengkali)
+    result = preprocessing.cek_data(dataset, "LB", rentang, pengkali)
+    assert sorted(result.index) == sorted(expected.index)
+
+def test_cek_data_finds_outliers():
+    dataset = make_dataset(0)
+    assert len(preprocessing.cek_data(dataset, "LB", 150, 1.5)) > 0
@@ -0,0 +1,36 @@
+import json
+import os
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+import registry
+import util as utils
+
+def fit_forest(seed=0):
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 100, (200, 3))
+    y = X @ [3.0, 2.0, 1.0] + rng.normal(0, 5, 200)
+    return RandomForestRegressor(n_estimators=5, random_state=seed).fit(X, y)
+
+def stage(tmp_path, name, model, metrics):
+    staging_dir = tmp_path / name
+    staging_dir.mkdir()
+    utils.pickle_dump(model, str(staging_dir / "model_1.pkl"))
+    (staging_dir / "metrics.json").write_text(json.dumps(metrics))
+    return str(staging_dir)
+
+def test_identical_retrain_publishes_same_version(tmp_path):
+    registry_dir = str(tmp_path / "registry")
+    first = registry.publish(registry_dir, stage(tmp_path, "a", fit_forest(), {"last_updated": "1", "fit_time": 0.5}))
+    second = registry.publish(registry_dir, stage(tmp_path, "b", fit_forest(), {"last_updated": "2", "fit_time": 0.7}))
+    assert first == second
+    assert [m["version"] for m in registry.list_versions(registry_dir)] == [first]
+    assert not os.path.exists(tmp_path / "b")
+
+def test_different_model_publishes_new_version(tmp_path):
+    registry_dir = str(tmp_path / "registry")
+    first = registry.publish(registry_dir, stage(tmp_path, "a", fit_forest(0), {}))
+    second = registry.publish(registry_dir, stage(tmp_path, "b", fit_forest(1), {}))
+    assert first != second
+    assert registry.current_version(registry_dir) == second
@@ -0,0 +1,57 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import single_flight
+
+def run_concurrently(flight, key, fn, callers=4):
+    """Start one leader blocked in fn, let the other callers join, then release it"""
+    release = threading.Event()
+    calls = []
+
+    def blocked():
+        calls.append(1)
+        release.wait(timeout=5)
+        return fn()
+
+    pool = ThreadPoolExecutor(max_workers=callers)
+    leader = pool.submit(flight.do, key, blocked)
+    while len(flight) == 0:
+        time.sleep(0.001)
+    followers = [pool.submit(flight.do, key, blocked) for _ in range(callers - 1)]
+    # Followers only look up the key, give them time to reach the shared future
+    time.sleep(0.2)
+    release.set()
+    pool.shutdown(wait=True)
+    return leader, followers, calls
+
+def test_concurrent_callers_share_one_call():
+    flight = single_flight.SingleFlight()
+    leader, followers, calls = run_concurrently(flight, "k", lambda: 42)
+
+    assert len(calls) == 1
+    assert leader.result() == (42, False)
+    assert [f.result() for f in followers] == [(42, True)] * 3
+    assert len(flight) == 0
+
+def test_error_reaches_every_caller():
+    flight = single_flight.SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    leader, followers, calls = run_concurrently(flight, "k", fail)
+    assert len(calls) == 1
+    for future in [leader, *followers]:
+        with pytest.raises(ValueError, match="boom"):
+            future.result()
+    assert len(flight) == 0
+
+def test_finished_key_runs_again():
+    # No caching: a later call with the same key computes again
+    flight = single_flight.SingleFlight()
+    results = iter([1, 2])
+    assert flight.do("k", lambda: next(results)) == (1, False)
+    assert flight.do("k", lambda: next(results)) == (2, False)